@@ -0,0 +1,52 @@
+"""
+Ahead-of-time compile the fitness and pairing kernels into a native
+extension module.
+
+Usage:
+    python build_native.py
+
+Writes src/genetic/_fitness_native (a platform-specific extension module).
+When it is present, src.genetic._fitness_numba uses it instead of JIT
+compiling score_melody and score_population, and src.genetic._pairing_numba
+uses its similarity_matrix, so server workers start without the first-call
+compilation delay and do not need Numba installed at runtime. All of them
+are ignored if the module was built from another KERNEL_VERSION. Rebuild it whenever the kernels change; delete it to go back
+to the JIT versions.
+
+Requires Numba (numba.pycc) and a C compiler.
+"""
+
+import os
+
+from numba.pycc import CC
+
+from src.genetic import _fitness_numba, _pairing_numba
+
+OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src', 'genetic')
+
+
+def build():
+    """Compile the kernels with their fixed argument types."""
+    cc = CC('_fitness_native')
+    cc.output_dir = OUTPUT_DIR
+    cc.verbose = True
+
+    # packed, tone_masks, tension_masks, avoid_masks, weights
+    cc.export('score_melody', 'f8(u8[:], u2[:], u2[:], u2[:], f8[:])')(
+        _fitness_numba._score_melody.py_func
+    )
+    # packed_population, tone_masks, tension_masks, avoid_masks, weights
+    cc.export('score_population', 'f8[:](u8[:, :], u2[:], u2[:], u2[:], f8[:])')(
+        _fitness_numba._score_population.py_func
+    )
+    cc.export('kernel_version', 'i8()')(_fitness_numba._kernel_version.py_func)
+
+    # pitch_matrix (one int8 genome per row)
+    cc.export('similarity_matrix', 'i8[:, :](i1[:, :])')(
+        _pairing_numba._similarity_matrix.py_func
+    )
+    cc.compile()
+
+
+if __name__ == '__main__':
+    build()
@@ -13,18 +13,45 @@ from pathlib import Path
 # Add parent directory to path for imports when running from src/
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-import os
 import glob
-import base64
+import io
+import os
+import threading
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
-from flask import Flask, render_template, jsonify, request, send_file
+from flask import Flask, render_template, jsonify, request, send_file, send_from_directory, url_for
+from flask.json.provider import DefaultJSONProvider
 
-from src.genetic import JazzFitnessEvaluator, GeneticJazzMelodyGenerator, FITNESS_WEIGHTS_CONFIG, get_default_weights
+try:
+    import orjson
+except ImportError:  # optional: fall back to Flask's stdlib json provider
+    orjson = None
+
+from src.genetic import JazzFitnessEvaluator, GeneticJazzMelodyGenerator, FITNESS_WEIGHTS_CONFIG
 from src.progressions import get_progression_from_xml
-from src.utils import create_jazz_score, export_to_midi, export_to_png
 from src.core import ChordProgression, ChordFactory
+from src.schema import GenerateRequest
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson, which also serializes NumPy values."""
+    
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 
 app = Flask(__name__, template_folder='../templates', static_folder='../static')
+if orjson is not None:
+    app.json = OrjsonProvider(app)
 
 # Path to data folder
 DATA_FOLDER = os.path.join(os.path.dirname(__file__), '..', 'data')
@@ -33,15 +60,95 @@ OUTPUT_FOLDER = os.path.join(os.path.dirname(__file__), '..', 'output')
 # Ensure output folder exists
 os.makedirs(OUTPUT_FOLDER, exist_ok=True)
 
+# Parsed progressions keyed by (xml path, mtime), least recently used first
+PROGRESSION_CACHE_SIZE = 64
+_progression_cache: OrderedDict[tuple[str, float], ChordProgression] = OrderedDict()
+_progression_cache_lock = threading.Lock()
+
+# Renders sheet music PNGs off the job threads; shared by all jobs, so at
+# most two renders run at once
+_export_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='export')
+
+# Background generation jobs by id. Jobs live in this process's memory, so
+# polling must reach the same server process that started the job. At most
+# MAX_PENDING_JOBS may be queued or running; further requests are refused
+# rather than queued without bound.
+MAX_JOBS = 64
+MAX_PENDING_JOBS = 16
+_job_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix='generate')
+_jobs: dict[str, 'GenerationJob'] = {}
+_jobs_lock = threading.Lock()
+
+# Index of the data folder, rebuilt only when the folder's mtime changes
+_song_index = {'mtime': None, 'list': [], 'by_name': {}}
+
+
+def output_url(filename):
+    """
+    Build the URL of a generated file in the output folder.
+    
+    The file's modification time is appended as a version parameter so
+    browsers fetch regenerated files instead of reusing a cached copy.
+    """
+    mtime_ns = os.stat(os.path.join(OUTPUT_FOLDER, filename)).st_mtime_ns
+    return url_for('serve_output', filename=filename, v=mtime_ns)
+
+
+def _refresh_song_index():
+    """Rescan the data folder if it changed since the last scan."""
+    mtime = os.stat(DATA_FOLDER).st_mtime_ns
+    if mtime == _song_index['mtime']:
+        return
+    
+    with os.scandir(DATA_FOLDER) as entries:
+        paths = sorted(
+            entry.path for entry in entries
+            if entry.name.endswith('.xml') and entry.is_file()
+        )
+    songs = [
+        {'name': os.path.basename(path)[:-len('.xml')], 'path': path}
+        for path in paths
+    ]
+    
+    _song_index['list'] = songs
+    _song_index['by_name'] = {song['name']: song['path'] for song in songs}
+    _song_index['mtime'] = mtime
+
 
 def get_available_songs():
     """Get list of available XML files from data folder."""
-    xml_files = glob.glob(os.path.join(DATA_FOLDER, '*.xml'))
-    songs = []
-    for f in sorted(xml_files):
-        name = os.path.basename(f).replace('.xml', '')
-        songs.append({'name': name, 'path': f})
-    return songs
+    _refresh_song_index()
+    return _song_index['list']
+
+
+def find_song_path(song_name):
+    """Return the XML path for a song name, or None if it does not exist."""
+    _refresh_song_index()
+    return _song_index['by_name'].get(song_name)
+
+
+def load_progression(xml_path):
+    """
+    Load a chord progression from XML, reusing previously parsed results.
+    
+    Entries are keyed by path and modification time, so an edited file is
+    parsed again on its next use. The cache is shared by request and job
+    threads, so it is only touched under its lock; parsing happens outside
+    it, and two threads missing at once simply parse the file twice.
+    """
+    key = (xml_path, os.path.getmtime(xml_path))
+    with _progression_cache_lock:
+        progression = _progression_cache.get(key)
+        if progression is not None:
+            _progression_cache.move_to_end(key)
+            return progression
+    
+    progression = get_progression_from_xml(xml_path)
+    with _progression_cache_lock:
+        _progression_cache[key] = progression
+        if len(_progression_cache) > PROGRESSION_CACHE_SIZE:
+            _progression_cache.popitem(last=False)
+    return progression
 
 
 @app.route('/')
@@ -63,20 +170,205 @@ def get_fitness_config():
     return jsonify({'weights': FITNESS_WEIGHTS_CONFIG})
 
 
+class GenerationJob:
+    """
+    A melody generation running in the background.
+    
+    Progress is written by the worker thread through report_progress()
+    and read by the polling endpoint.
+    
+    Attributes:
+        id: Job identifier returned to the client
+        generations: Number of generations requested
+        generation: Last generation evaluated so far
+        best_fitness: Best fitness seen so far, or None before the first
+        future: Future resolving to the job's result dict
+    """
+    
+    def __init__(self, generations):
+        self.id = uuid.uuid4().hex
+        self.generations = generations
+        self.generation = 0
+        self.best_fitness = None
+        self.future = None
+        self._cancel = threading.Event()
+    
+    def report_progress(self, generation, best_fitness):
+        """Progress callback for the generator; returns False once cancelled."""
+        self.generation = generation
+        self.best_fitness = best_fitness
+        return not self._cancel.is_set()
+    
+    def cancel(self):
+        """
+        Stop the job after its current generation, or before it starts.
+        
+        Returns:
+            False if the job had already finished, in which case nothing
+            changes
+        """
+        if self.future.done():
+            return False
+        self._cancel.set()
+        self.future.cancel()
+        return True
+    
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+    
+    @property
+    def status(self):
+        """'running', 'done', 'error' or 'cancelled'."""
+        future = self.future
+        if not future.done():
+            return 'running'
+        if future.cancelled():
+            return 'cancelled'
+        if future.exception() is not None:
+            return 'error'
+        # _run_generation returns None when it stopped on a cancel; a cancel
+        # that arrived too late to stop it leaves the job done
+        return 'cancelled' if future.result() is None else 'done'
+    
+    def finished_result(self):
+        """The result dict if the job completed successfully, else None."""
+        return self.future.result() if self.status == 'done' else None
+
+
+def _submit_job(job, *args):
+    """
+    Start a job and register it, forgetting the oldest finished jobs.
+    
+    Each job writes its files to the output folder named after its id (the
+    sheet music image, music21's intermediate MusicXML and, with
+    keep_on_disk, the MIDI file), which are deleted when the job is
+    forgotten.
+    
+    Returns:
+        False, without starting the job, if MAX_PENDING_JOBS jobs are
+        already queued or running
+    """
+    with _jobs_lock:
+        pending = sum(not old.future.done() for old in _jobs.values())
+        if pending >= MAX_PENDING_JOBS:
+            return False
+        job.future = _job_executor.submit(_run_generation, job, *args)
+        _jobs[job.id] = job
+        finished = [key for key, old in _jobs.items() if old.future.done()]
+        evicted = [_jobs.pop(key) for key in finished[:max(0, len(_jobs) - MAX_JOBS)]]
+    
+    for old in evicted:
+        for path in glob.glob(os.path.join(OUTPUT_FOLDER, f"generated_*_{old.id}*")):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    return True
+
+
+def _run_generation(job, progression, gen_request):
+    """
+    Evolve a melody and export it, running on a job worker thread.
+    
+    Returns:
+        Dict describing the result, or None if the job was cancelled
+    """
+    # music21 is slow to import and only needed here, so it is loaded on the
+    # first generation instead of at startup
+    from src.utils import create_jazz_score, export_to_png, midi_bytes
+    
+    try:
+        # Setup fitness evaluator and genetic algorithm from the parsed request
+        fitness_evaluator = JazzFitnessEvaluator(
+            progression=progression,
+            weights=gen_request.weights
+        )
+        
+        params = gen_request.params
+        generator = GeneticJazzMelodyGenerator(
+            progression=progression,
+            fitness_evaluator=fitness_evaluator,
+            population_size=params.population_size,
+            mutation_rate=params.mutation_rate,
+            elite_size=params.elite_size,
+            pairing_strategy=params.pairing_strategy
+        )
+        
+        # Generate melody
+        best_melody = generator.generate(
+            generations=gen_request.generations,
+            on_progress=job.report_progress
+        )
+        if job.cancelled:
+            return None
+        final_fitness = fitness_evaluator.evaluate(best_melody)
+        
+        # Create score
+        score = create_jazz_score(best_melody, progression)
+        
+        # Export sheet music as PNG while the MIDI is rendered in memory; the
+        # PNG export waits on an external renderer, so the two overlap.
+        # music21 streams are not thread-safe, so the export thread gets its
+        # own score. The image is named after the job, so concurrent jobs for
+        # the same song never overwrite each other's sheet music
+        safe_name = progression.name.replace(' ', '_').replace("'", "").replace("(", "").replace(")", "")
+        png_filename = f"generated_{safe_name}_{job.id}"
+        png_path = os.path.join(OUTPUT_FOLDER, png_filename)
+        png_future = _export_executor.submit(
+            export_to_png, create_jazz_score(best_melody, progression), png_path
+        )
+        
+        # The MIDI is served from memory; download_name is only the name the
+        # browser saves it under
+        midi_data = midi_bytes(score)
+        download_name = f"generated_{safe_name}.mid"
+        midi_file = None
+        if gen_request.keep_on_disk:
+            # Named after the job like the sheet music, and deleted with it
+            midi_file = f"generated_{safe_name}_{job.id}.mid"
+            with open(os.path.join(OUTPUT_FOLDER, midi_file), 'wb') as f:
+                f.write(midi_data)
+        
+        try:
+            sheet_filename = os.path.basename(png_future.result())
+        except Exception as e:
+            print(f"Warning: Could not generate sheet music image: {e}")
+            sheet_filename = None
+        
+        return {
+            'song_name': progression.name,
+            'chords': list(progression.chord_names),
+            'fitness_score': round(final_fitness, 4),
+            'download_name': download_name,
+            'midi_data': midi_data,
+            'midi_file': midi_file,
+            'sheet_filename': sheet_filename
+        }
+    except Exception:
+        traceback.print_exc()
+        raise
+
+
 @app.route('/api/generate', methods=['POST'])
 def generate_melody():
-    """API endpoint to generate a melody for a selected song or custom progression."""
-    data = request.json
-    mode = data.get('mode', 'song')
-    generations = data.get('generations', 1000)
+    """
+    API endpoint to start generating a melody for a song or custom progression.
     
+    The request is validated immediately; the genetic algorithm then runs in
+    the background. Responds with a job id to poll at /api/generate/<job_id>.
+    """
     try:
-        if mode == 'custom':
+        gen_request = GenerateRequest.from_json(request.json)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        if gen_request.mode == 'custom':
             # Handle custom chord progression
-            chords_data = data.get('chords', [])
-            progression_name = data.get('progression_name', 'Custom Progression')
+            chords_data = gen_request.chords
             
-            if not chords_data or len(chords_data) != 8:
+            if len(chords_data) != 8:
                 return jsonify({'error': 'Custom progression must have exactly 8 chords'}), 400
             
             # Create JazzChord objects from the chord data
@@ -90,123 +382,112 @@ def generate_melody():
                 except ValueError as e:
                     return jsonify({'error': f'Invalid chord: {root}{quality} - {str(e)}'}), 400
             
-            progression = ChordProgression(chords=chords, name=progression_name)
+            progression = ChordProgression(chords=chords, name=gen_request.progression_name)
         else:
             # Handle song selection mode
-            song_name = data.get('song')
+            song_name = gen_request.song
             if not song_name:
                 return jsonify({'error': 'No song selected'}), 400
             
             # Find the XML file
-            xml_path = os.path.join(DATA_FOLDER, f'{song_name}.xml')
-            if not os.path.exists(xml_path):
+            xml_path = find_song_path(song_name)
+            if xml_path is None:
                 return jsonify({'error': f'Song not found: {song_name}'}), 404
             
             # Load chord progression
-            progression = get_progression_from_xml(xml_path)
+            progression = load_progression(xml_path)
         
-        # Get chord names for display
-        chord_names = [chord.name for chord in progression.chords]
-        
-        # Setup fitness evaluator using centralized config
-        default_weights = get_default_weights()
-        incoming_weights = data.get('weights') or {}
-        weights = {}
-        for key, default_value in default_weights.items():
-            try:
-                weights[key] = float(incoming_weights.get(key, default_value))
-            except (TypeError, ValueError):
-                weights[key] = default_value
-
-        default_numeric_params = {
-            'population_size': 100,
-            'mutation_rate': 0.15,
-            'elite_size': 5
-        }
-        default_string_params = {
-            'pairing_strategy': 'random'
-        }
-        fitness_evaluator = JazzFitnessEvaluator(
-            progression=progression,
-            weights=weights
-        )
-        
-        incoming_params = data.get('params') or {}
-        params = {}
-        for key, default_value in default_numeric_params.items():
-            try:
-                params[key] = float(incoming_params.get(key, default_value))
-            except (TypeError, ValueError):
-                params[key] = default_value
-        for key, default_value in default_string_params.items():
-            incoming_value = incoming_params.get(key, default_value)
-            if incoming_value is None:
-                params[key] = default_value
-            else:
-                params[key] = str(incoming_value)
-        
-        # Setup genetic algorithm
-        generator = GeneticJazzMelodyGenerator(
-            progression=progression,
-            fitness_evaluator=fitness_evaluator,
-            population_size=int(params['population_size']),
-            mutation_rate=params['mutation_rate'],
-            elite_size=int(params['elite_size']),
-            pairing_strategy=params['pairing_strategy']
-        )
-        
-        # Generate melody
-        best_melody = generator.generate(generations=generations)
-        final_fitness = fitness_evaluator.evaluate(best_melody)
-        
-        # Create score
-        score = create_jazz_score(best_melody, progression)
-        
-        # Export MIDI
-        safe_name = progression.name.replace(' ', '_').replace("'", "").replace("(", "").replace(")", "")
-        midi_filename = f"generated_{safe_name}.mid"
-        midi_path = os.path.join(OUTPUT_FOLDER, midi_filename)
-        export_to_midi(score, midi_path)
-        
-        # Export sheet music as PNG
-        png_filename = f"generated_{safe_name}"
-        png_path = os.path.join(OUTPUT_FOLDER, png_filename)
-        try:
-            actual_png_path = export_to_png(score, png_path)
-            # Read PNG and encode as base64
-            with open(actual_png_path, 'rb') as f:
-                sheet_base64 = base64.b64encode(f.read()).decode('utf-8')
-        except Exception as e:
-            print(f"Warning: Could not generate sheet music image: {e}")
-            sheet_base64 = None
-        
-        # Read MIDI file and encode as base64 for browser playback
-        with open(midi_path, 'rb') as f:
-            midi_base64 = base64.b64encode(f.read()).decode('utf-8')
+        job = GenerationJob(gen_request.generations)
+        if not _submit_job(job, progression, gen_request):
+            return jsonify({'error': 'Too many generations in progress, try again shortly'}), 503
         
         return jsonify({
-            'success': True,
-            'song_name': progression.name,
-            'chords': chord_names,
-            'fitness_score': round(final_fitness, 4),
-            'midi_base64': midi_base64,
-            'midi_filename': midi_filename,
-            'sheet_base64': sheet_base64
-        })
+            'job_id': job.id,
+            'status_url': url_for('generation_status', job_id=job.id)
+        }), 202
         
     except Exception as e:
-        import traceback
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/download/<filename>')
-def download_midi(filename):
-    """Download a generated MIDI file."""
-    midi_path = os.path.join(OUTPUT_FOLDER, filename)
-    if os.path.exists(midi_path):
-        return send_file(midi_path, as_attachment=True)
-    return jsonify({'error': 'File not found'}), 404
+@app.route('/api/generate/<job_id>')
+def generation_status(job_id):
+    """
+    API endpoint to poll a generation job.
+    
+    The status is 'running', 'done', 'error' or 'cancelled'. Once done, the
+    response carries the same result fields the page displays.
+    """
+    job = _jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    response = {
+        'job_id': job.id,
+        'generation': job.generation,
+        'generations': job.generations,
+        'best_fitness': job.best_fitness,
+    }
+    
+    response['status'] = job.status
+    if response['status'] == 'error':
+        response['error'] = str(job.future.exception())
+    elif response['status'] == 'done':
+        result = dict(job.future.result())
+        del result['midi_data']
+        sheet_filename = result.pop('sheet_filename')
+        midi_file = result.pop('midi_file')
+        result['midi_url'] = url_for('generation_midi', job_id=job.id)
+        result['midi_file_url'] = output_url(midi_file) if midi_file else None
+        result['sheet_url'] = output_url(sheet_filename) if sheet_filename else None
+        response['result'] = result
+    
+    return jsonify(response)
+
+
+@app.route('/api/generate/<job_id>/midi')
+def generation_midi(job_id):
+    """Serve the MIDI file of a finished generation job from memory."""
+    job = _jobs.get(job_id)
+    result = job.finished_result() if job is not None else None
+    if result is None:
+        return jsonify({'error': 'File not found'}), 404
+    
+    # A job's result never changes, so browsers may cache it freely
+    return send_file(
+        io.BytesIO(result['midi_data']),
+        mimetype='audio/midi',
+        download_name=result['download_name'],
+        etag=job.id,
+        max_age=3600
+    )
+
+
+@app.route('/api/generate/<job_id>', methods=['DELETE'])
+def cancel_generation(job_id):
+    """
+    API endpoint to cancel a running generation job.
+    
+    A job that has already finished is left as it is, and the response
+    reports its final status with 409 Conflict.
+    """
+    job = _jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if not job.cancel():
+        return jsonify({
+            'job_id': job.id,
+            'status': job.status,
+            'error': 'Job already finished'
+        }), 409
+    return jsonify({'job_id': job.id, 'status': 'cancelled'})
+
+
+@app.route('/output/<path:filename>')
+def serve_output(filename):
+    """Serve a generated MIDI or PNG file, with ETag/Last-Modified support."""
+    return send_from_directory(OUTPUT_FOLDER, filename, conditional=True)
 
 
 if __name__ == '__main__':
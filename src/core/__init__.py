@@ -15,6 +15,10 @@ from .constants import (
     EIGHTH_NOTE_DURATION,
     NUM_BARS,
     TOTAL_NOTES,
+    NOTE_OTHER,
+    NOTE_CHORD_TONE,
+    NOTE_TENSION,
+    NOTE_AVOID,
 )
 from .chorddata import JazzChord, ChordProgression, MelodyGenome
 from .chordfactory import ChordFactory
@@ -28,6 +32,10 @@ __all__ = [
     "EIGHTH_NOTE_DURATION",
     "NUM_BARS",
     "TOTAL_NOTES",
+    "NOTE_OTHER",
+    "NOTE_CHORD_TONE",
+    "NOTE_TENSION",
+    "NOTE_AVOID",
     # Data classes
     "JazzChord",
     "ChordProgression",
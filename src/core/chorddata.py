@@ -7,12 +7,19 @@ This module provides the core data structures used throughout the application:
 - MelodyGenome: Represents a melody as a genetic sequence
 """
 
+import re
 from dataclasses import dataclass, field
+from functools import cached_property
 
-from .constants import NUM_BARS, NOTES_PER_BAR, TOTAL_NOTES, REST
+import numpy as np
 
+from .constants import (
+    NUM_BARS, NOTES_PER_BAR, TOTAL_NOTES, REST,
+    NOTE_CHORD_TONE, NOTE_TENSION, NOTE_AVOID
+)
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class JazzChord:
     """
     Represents a jazz 7th chord with its musical properties.
@@ -23,15 +30,63 @@ class JazzChord:
         chord_tones: Tuple of intervals from root that are chord tones (1, 3, 5, 7)
         tensions: Tuple of available tension intervals (9, 11, 13)
         avoid_notes: Tuple of intervals that clash with the chord
+        chord_tone_pc_mask: 12-bit mask of the chord tones' pitch classes
+        tension_pc_mask: 12-bit mask of the tensions' pitch classes
+        avoid_pc_mask: 12-bit mask of the avoid notes' pitch classes
+        music21_name: name spelled for music21 chord symbols, which use
+            '-' for flats (e.g., "B-maj7" for "Bbmaj7")
         
     Note:
-        All intervals are in semitones from the root.
+        All intervals are in semitones from the root. The masks are derived
+        from them and have bit (root + interval) % 12 set, so testing an
+        absolute pitch class is a single (mask >> pc) & 1.
     """
     name: str
     root: int  # Pitch class 0-11 (C=0, C#=1, ..., B=11)
     chord_tones: tuple[int, ...]  # Intervals: root, 3rd, 5th, 7th
     tensions: tuple[int, ...]  # Available tensions: 9, 11, 13
     avoid_notes: tuple[int, ...]  # Notes to avoid
+    chord_tone_pc_mask: int = field(init=False, repr=False, compare=False)
+    tension_pc_mask: int = field(init=False, repr=False, compare=False)
+    avoid_pc_mask: int = field(init=False, repr=False, compare=False)
+    music21_name: str = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Frozen dataclass: derived fields are written straight to their slots
+        object.__setattr__(
+            self, 'chord_tone_pc_mask', _pitch_class_mask(self.root, self.chord_tones)
+        )
+        object.__setattr__(
+            self, 'tension_pc_mask', _pitch_class_mask(self.root, self.tensions)
+        )
+        object.__setattr__(
+            self, 'avoid_pc_mask', _pitch_class_mask(self.root, self.avoid_notes)
+        )
+        object.__setattr__(self, 'music21_name', _FLAT_RE.sub(r'\1-', self.name))
+    
+    def is_chord_tone_pc(self, pitch_class: int) -> bool:
+        """Check if an absolute pitch class (0-11) is a chord tone."""
+        return bool((self.chord_tone_pc_mask >> pitch_class) & 1)
+    
+    def is_tension_pc(self, pitch_class: int) -> bool:
+        """Check if an absolute pitch class (0-11) is an available tension."""
+        return bool((self.tension_pc_mask >> pitch_class) & 1)
+    
+    def is_avoid_pc(self, pitch_class: int) -> bool:
+        """Check if an absolute pitch class (0-11) is an avoid note."""
+        return bool((self.avoid_pc_mask >> pitch_class) & 1)
+
+
+# A flat after a note letter, spelled 'b' in chord names and '-' in music21
+_FLAT_RE = re.compile(r'([A-G])b')
+
+
+def _pitch_class_mask(root: int, intervals: tuple[int, ...]) -> int:
+    """Build a 12-bit mask with bit (root + interval) % 12 set per interval."""
+    mask = 0
+    for interval in intervals:
+        mask |= 1 << ((root + interval) % 12)
+    return mask
 
 
 @dataclass
@@ -52,9 +107,73 @@ class ChordProgression:
     def __post_init__(self):
         if len(self.chords) != NUM_BARS:
             raise ValueError(f"Progression must have exactly {NUM_BARS} chords")
+    
+    @cached_property
+    def chord_names(self) -> tuple[str, ...]:
+        """Display names of the chords, one per bar (computed once)."""
+        return tuple(chord.name for chord in self.chords)
+    
+    @cached_property
+    def note_class_table(self) -> np.ndarray:
+        """
+        Note class of every pitch class against each bar's chord.
+        
+        A (NUM_BARS, 12) uint8 array where table[bar, pc] is NOTE_CHORD_TONE,
+        NOTE_TENSION, NOTE_AVOID or NOTE_OTHER (computed once). Should a pitch
+        class belong to more than one set, chord tone wins over tension and
+        tension over avoid note.
+        """
+        table = np.zeros((NUM_BARS, 12), dtype=np.uint8)
+        pitch_classes = np.arange(12)
+        for bar_idx, chord in enumerate(self.chords):
+            for note_class, mask in (
+                (NOTE_AVOID, chord.avoid_pc_mask),
+                (NOTE_TENSION, chord.tension_pc_mask),
+                (NOTE_CHORD_TONE, chord.chord_tone_pc_mask),
+            ):
+                table[bar_idx, (mask >> pitch_classes) & 1 == 1] = note_class
+        return table
+    
+    @cached_property
+    def chord_tone_matrix(self) -> np.ndarray:
+        """
+        Chord tones of each bar voiced in the bass register (computed once).
+        
+        A (NUM_BARS, n) int8 array holding, per bar, the MIDI pitches of its
+        chord's tones from C3 upwards, as used for the accompaniment, with
+        rows padded with REST to the longest chord.
+        """
+        num_tones = max(len(chord.chord_tones) for chord in self.chords)
+        matrix = np.full((NUM_BARS, num_tones), REST, dtype=np.int8)
+        for bar_idx, chord in enumerate(self.chords):
+            matrix[bar_idx, :len(chord.chord_tones)] = [
+                48 + chord.root + interval for interval in chord.chord_tones
+            ]
+        return matrix
+    
+    @cached_property
+    def chord_tone_pitch_table(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Chord tones of each bar as absolute MIDI pitches (computed once).
+        
+        Returns:
+            A (NUM_BARS, n) int8 array holding, per bar, the chord tones of
+            its chord in the C4 and C5 octaves (rows padded to the longest),
+            and an array with the number of valid entries in each row
+        """
+        options = [
+            [octave + chord.root + interval
+             for octave in (60, 72) for interval in chord.chord_tones]
+            for chord in self.chords
+        ]
+        counts = np.array([len(pitches) for pitches in options])
+        table = np.zeros((NUM_BARS, counts.max()), dtype=np.int8)
+        for bar_idx, pitches in enumerate(options):
+            table[bar_idx, :len(pitches)] = pitches
+        return table, counts
 
 
-@dataclass
+@dataclass(slots=True)
 class MelodyGenome:
     """
     Represents a melody as a genetic sequence.
@@ -63,16 +182,64 @@ class MelodyGenome:
     Each bar contains NOTES_PER_BAR slots, each slot is an eighth note.
     A value of REST (-1) indicates a rest.
     
+    Pitches are stored in a contiguous int8 NumPy array (MIDI 60-84 and
+    REST all fit in a signed byte), so a whole genome is only TOTAL_NOTES
+    bytes and can be processed with vectorized NumPy operations.
+    
+    Use MelodyGenome.empty() for an all-rest melody.
+    
     Attributes:
-        pitches: List of MIDI pitch values (or REST) for each eighth note slot
+        pitches: int8 array of MIDI pitch values (or REST) for each eighth
+            note slot. Any integer sequence passed in is converted.
     """
-    pitches: list[int] = field(default_factory=list)
+    pitches: np.ndarray
     
     def __post_init__(self):
-        if not self.pitches:
-            self.pitches = [REST] * TOTAL_NOTES
+        # No-op (no copy) for contiguous int8 arrays such as rows of a
+        # population matrix; converts any other sequence. Contiguity is
+        # required by the packed view below.
+        self.pitches = np.ascontiguousarray(self.pitches, dtype=np.int8)
+    
+    @classmethod
+    def empty(cls) -> 'MelodyGenome':
+        """Create a genome in which every slot is a rest."""
+        return cls(np.full(TOTAL_NOTES, REST, dtype=np.int8))
+    
+    @property
+    def packed(self) -> np.ndarray:
+        """
+        Zero-copy view of the pitches as one uint64 word per bar.
+        
+        Each 8-slot bar occupies the 8 bytes of a single word, which lets
+        compiled fitness kernels load a whole bar at once. Being a view,
+        it is always in sync with pitches.
+        """
+        return self.pitches.view(np.uint64)
+    
+    @property
+    def active_mask(self) -> np.ndarray:
+        """
+        Boolean mask of the slots holding a note rather than a rest.
+        
+        Computed on access rather than stored, since pitches may be a view
+        of a population matrix that is written to directly.
+        """
+        return self.pitches != REST
+    
+    @property
+    def active_pitches(self) -> np.ndarray:
+        """The pitches of the notes in order, with rests dropped."""
+        return self.pitches[self.pitches != REST]
+    
+    @property
+    def bars(self) -> np.ndarray:
+        """
+        Zero-copy (NUM_BARS, NOTES_PER_BAR) view of the pitches, one row
+        per bar, for indexing bars or reducing over them without slicing.
+        """
+        return self.pitches.reshape(NUM_BARS, NOTES_PER_BAR)
     
-    def get_bar(self, bar_index: int) -> list[int]:
+    def get_bar(self, bar_index: int) -> np.ndarray:
         """
         Get pitches for a specific bar.
         
@@ -80,11 +247,11 @@ class MelodyGenome:
             bar_index: Zero-indexed bar number (0-7)
             
         Returns:
-            List of MIDI pitches for the specified bar
+            View (not a copy) of the MIDI pitches for the specified bar
         """
         start = bar_index * NOTES_PER_BAR
         return self.pitches[start:start + NOTES_PER_BAR]
     
     def copy(self) -> 'MelodyGenome':
         """Create a deep copy of this genome."""
-        return MelodyGenome(pitches=self.pitches.copy())
+        return MelodyGenome(self.pitches.copy())
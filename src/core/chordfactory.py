@@ -4,8 +4,14 @@ Factory for creating jazz chord objects.
 This module provides a factory class for creating JazzChord objects from
 root note names and chord type identifiers, supporting common jazz chord
 types including major 7th, minor 7th, dominant 7th, and alterations.
+
+Every (root, type) combination is built once at import time and kept in a
+read-only table, so create() returns shared JazzChord instances instead of
+allocating new ones.
 """
 
+from types import MappingProxyType
+
 from .chorddata import JazzChord
 
 
@@ -111,16 +117,21 @@ class ChordFactory:
             chord_type: Chord type identifier (e.g., "maj7", "min7", "dom7")
             
         Returns:
-            JazzChord object with the specified root and type
+            Shared JazzChord object with the specified root and type
             
         Raises:
             ValueError: If root_name or chord_type is not recognized
         """
-        if root_name not in cls.NOTE_TO_PC:
-            raise ValueError(f"Unknown root note: {root_name}")
-        if chord_type not in cls.CHORD_TYPES:
+        chord = _CHORD_TABLE.get((root_name, chord_type))
+        if chord is None:
+            if root_name not in cls.NOTE_TO_PC:
+                raise ValueError(f"Unknown root note: {root_name}")
             raise ValueError(f"Unknown chord type: {chord_type}")
-        
+        return chord
+    
+    @classmethod
+    def _build(cls, root_name: str, chord_type: str) -> JazzChord:
+        """Construct a new JazzChord (used to populate the chord table)."""
         root_pc = cls.NOTE_TO_PC[root_name]
         chord_tones, tensions, avoid_notes = cls.CHORD_TYPES[chord_type]
         
@@ -134,3 +145,11 @@ class ChordFactory:
             tensions=tensions,
             avoid_notes=avoid_notes
         )
+
+
+# Every supported chord, keyed by (root_name, chord_type)
+_CHORD_TABLE = MappingProxyType({
+    (root_name, chord_type): ChordFactory._build(root_name, chord_type)
+    for root_name in ChordFactory.NOTE_TO_PC
+    for chord_type in ChordFactory.CHORD_TYPES
+})
@@ -18,3 +18,9 @@ EIGHTH_NOTE_DURATION = 0.5  # In quarter note units
 # Structure constants
 NUM_BARS = 8                          # Number of bars in the progression
 TOTAL_NOTES = NOTES_PER_BAR * NUM_BARS  # Total notes in a melody
+
+# Note classes of a pitch class against a chord (ChordProgression.note_class_table)
+NOTE_OTHER = 0       # Neither chord tone, tension nor avoid note
+NOTE_CHORD_TONE = 1
+NOTE_TENSION = 2
+NOTE_AVOID = 3
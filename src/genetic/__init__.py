@@ -8,7 +8,7 @@ This module provides:
 
 from .fitness import JazzFitnessEvaluator, FITNESS_WEIGHTS_CONFIG, get_default_weights
 from .generator import GeneticJazzMelodyGenerator
-from .pairing import PAIRING_STRATEGIES, PairingStrategy, resolve_pairing_strategy
+from .pairing import PAIRING_STRATEGIES, PairingStrategy, ParentPool, resolve_pairing_strategy
 
 __all__ = [
     "JazzFitnessEvaluator",
@@ -17,5 +17,6 @@ __all__ = [
     "get_default_weights",
     "PAIRING_STRATEGIES",
     "PairingStrategy",
+    "ParentPool",
     "resolve_pairing_strategy",
 ]
@@ -0,0 +1,284 @@
+"""
+Vectorized NumPy implementations of the built-in fitness components.
+
+Each function scores a whole population at once. The population is an
+int8 matrix of shape (P, TOTAL_NOTES) with one genome per row, and the
+result is a float64 array of P scores. The functions mirror the
+per-genome methods of JazzFitnessEvaluator exactly, whose docstrings
+describe what each metric measures.
+
+Components that walk the melody note by note (ignoring rests) compact
+each row first: the non-rest pitches are moved to the front, in order,
+and a per-row count marks how many of them are valid.
+"""
+
+import numpy as np
+
+from src.core import (
+    NUM_BARS, NOTES_PER_BAR, TOTAL_NOTES, REST,
+    NOTE_OTHER, NOTE_CHORD_TONE, NOTE_TENSION, NOTE_AVOID
+)
+from ._fitness_numba import MOTION_SCORE_LUT, PITCH_CLASS_LUT, REST_PC
+
+
+# Strong beats: positions 0 (beat 1) and 4 (beat 3) of every bar
+STRONG_BEATS = np.zeros(TOTAL_NOTES, dtype=bool)
+STRONG_BEATS[0::NOTES_PER_BAR] = True
+STRONG_BEATS[4::NOTES_PER_BAR] = True
+
+NUM_PHRASES = 4
+PHRASE_LENGTH = TOTAL_NOTES // NUM_PHRASES
+
+# Row offset of each slot in a flattened slot note class table
+_SLOT_OFFSETS = np.arange(TOTAL_NOTES) * (REST_PC + 1)
+
+
+def _compact(population: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Move the non-rest pitches of every row to the front, preserving order.
+
+    Returns:
+        Tuple of (compacted int16 matrix, number of notes per row)
+    """
+    active = population != REST
+    order = np.argsort(~active, axis=1, kind='stable')
+    compact = np.take_along_axis(population, order, axis=1).astype(np.int16)
+    return compact, active.sum(axis=1)
+
+
+def slot_note_classes(note_class_table: np.ndarray) -> np.ndarray:
+    """
+    Expand a progression's note_class_table to a flat per-slot lookup.
+
+    Each bar's row is repeated for every slot of the bar and gets an extra
+    NOTE_OTHER column for rests (pitch class REST_PC in PITCH_CLASS_LUT).
+    The result is flattened for classify_notes.
+    """
+    with_rest = np.pad(note_class_table, ((0, 0), (0, 1)), constant_values=NOTE_OTHER)
+    return np.repeat(with_rest, NOTES_PER_BAR, axis=0).ravel()
+
+
+def classify_notes(population: np.ndarray, slot_classes: np.ndarray) -> np.ndarray:
+    """
+    Look up the note class of every slot against the chord of its bar.
+
+    Args:
+        population: int8 array whose last axis has TOTAL_NOTES slots
+        slot_classes: Flat table built by slot_note_classes()
+
+    Returns:
+        uint8 array of NOTE_* values shaped like population; rests are
+        NOTE_OTHER
+    """
+    pitch_classes = PITCH_CLASS_LUT[population.view(np.uint8)]
+    return np.take(slot_classes, _SLOT_OFFSETS + pitch_classes)
+
+
+def harmony_scores(
+    population: np.ndarray,
+    slot_classes: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Score chord-tone emphasis, tension usage and wrong notes in one pass.
+
+    Args:
+        population: int8 matrix of shape (P, TOTAL_NOTES)
+        slot_classes: Flat table built by slot_note_classes()
+
+    Returns:
+        Tuple of (chord_tone_emphasis, tension_usage, avoid_wrong_notes)
+    """
+    active = population != REST
+    classes = classify_notes(population, slot_classes)
+    is_tone = classes == NOTE_CHORD_TONE
+    is_tension = classes == NOTE_TENSION
+    is_avoid = classes == NOTE_AVOID
+
+    # Chord tones on strong beats score 1, tensions 0.5
+    strong_checks = (active & STRONG_BEATS).sum(axis=1)
+    strong_score = (
+        (is_tone & STRONG_BEATS).sum(axis=1)
+        + 0.5 * (is_tension & STRONG_BEATS).sum(axis=1)
+    )
+    chord_tone_emphasis = np.divide(
+        strong_score, strong_checks,
+        out=np.full(len(population), 0.5), where=strong_checks > 0
+    )
+
+    total_notes = active.sum(axis=1)
+    has_notes = total_notes > 0
+
+    # Tension ratio peaks at 30% and decreases on either side
+    tension_ratio = np.divide(
+        is_tension.sum(axis=1), total_notes,
+        out=np.zeros(len(population)), where=has_notes
+    )
+    tension_usage = np.where(
+        tension_ratio <= 0.30,
+        tension_ratio / 0.30,
+        np.maximum(0, 1 - (tension_ratio - 0.30) / 0.4)
+    )
+    tension_usage[~has_notes] = 0
+
+    # Avoid notes cost 1, other non-chord, non-tension notes cost 0.3
+    mild = active & (classes == NOTE_OTHER)
+    penalty = is_avoid.sum(axis=1) + 0.3 * mild.sum(axis=1)
+    avoid_wrong_notes = 1 - np.divide(
+        penalty, total_notes,
+        out=np.full(len(population), 0.5), where=has_notes
+    )
+
+    return chord_tone_emphasis, tension_usage, avoid_wrong_notes
+
+
+def call_and_response(population: np.ndarray) -> np.ndarray:
+    """Vectorized JazzFitnessEvaluator._call_and_response."""
+    bar_counts = (population != REST).reshape(-1, NUM_BARS, NOTES_PER_BAR).sum(axis=2)
+    densities = bar_counts.reshape(-1, NUM_PHRASES, 2).sum(axis=2) / (2 * NOTES_PER_BAR)
+    call, breath, response, resolution = densities.T
+
+    score = np.where(
+        (0.4 <= call) & (call <= 0.7), 0.25,
+        np.where((0.3 <= call) & (call <= 0.8), 0.15, 0.0)
+    )
+    score = score + np.where(
+        (0.2 <= breath) & (breath <= 0.5), 0.25,
+        np.where(breath < call, 0.15, 0.0)
+    )
+    score = score + np.where(
+        (0.4 <= response) & (response <= 0.7), 0.25,
+        np.where((0.3 <= response) & (response <= 0.8), 0.15, 0.0)
+    )
+    winding_down = bar_counts[:, 6] > bar_counts[:, 7]
+    score = score + np.where(
+        winding_down, 0.25,
+        np.where((0.2 <= resolution) & (resolution <= 0.6), 0.15, 0.0)
+    )
+    return score
+
+
+def melodic_motion(population: np.ndarray) -> np.ndarray:
+    """Vectorized JazzFitnessEvaluator._melodic_motion."""
+    compact, note_counts = _compact(population)
+    intervals = np.abs(np.diff(compact, axis=1))
+    interval_counts = note_counts - 1
+    valid = np.arange(TOTAL_NOTES - 1) < interval_counts[:, np.newaxis]
+
+    scores = MOTION_SCORE_LUT[intervals]
+    return np.divide(
+        np.where(valid, scores, 0.0).sum(axis=1), interval_counts,
+        out=np.full(len(population), 0.5), where=interval_counts > 0
+    )
+
+
+def arpeggio_scale_mix(population: np.ndarray) -> np.ndarray:
+    """Vectorized JazzFitnessEvaluator._arpeggio_scale_mix."""
+    compact, note_counts = _compact(population)
+    steps = np.diff(compact, axis=1)
+    positions = np.arange(TOTAL_NOTES - 1)
+
+    valid = positions < (note_counts - 1)[:, np.newaxis]
+    step_count = (valid & (np.abs(steps) <= 2)).sum(axis=1)
+    total_movements = np.maximum(note_counts - 1, 1)
+
+    # "Arpeggio up, scale down": skip up of 3+, then two steps down
+    step_down = (steps <= -1) & (steps >= -2)
+    arp_up_scale_down = (
+        (steps[:, :-2] >= 3) & step_down[:, 1:-1] & step_down[:, 2:]
+        & (positions[:-2] < (note_counts - 3)[:, np.newaxis])
+    ).sum(axis=1)
+    patterns = np.maximum(note_counts - 3, 0)
+
+    # Ideal ratio: about 60% steps, 40% skips
+    step_ratio = step_count / total_movements
+    ratio_score = np.maximum(0, 1.0 - np.abs(0.6 - step_ratio) * 2)
+    pattern_score = np.minimum(1.0, arp_up_scale_down / np.maximum(patterns // 4, 1))
+
+    return np.where(
+        note_counts < 4, 0.5, 0.6 * ratio_score + 0.4 * pattern_score
+    )
+
+
+def phrase_contour(population: np.ndarray) -> np.ndarray:
+    """Vectorized JazzFitnessEvaluator._phrase_contour."""
+    phrases = population.reshape(-1, PHRASE_LENGTH)
+    compact, note_counts = _compact(phrases)
+    directions = np.sign(np.diff(compact, axis=1))
+
+    max_changes = note_counts - 2
+    valid = np.arange(PHRASE_LENGTH - 2) < max_changes[:, np.newaxis]
+    direction_changes = (
+        valid & (directions[:, :-1] * directions[:, 1:] < 0)
+    ).sum(axis=1)
+
+    # Fewer direction changes = more coherent contour
+    change_ratio = direction_changes / np.maximum(max_changes, 1)
+    phrase_scores = np.where(
+        change_ratio <= 0.3,
+        0.8 + change_ratio * 0.67,
+        np.where(
+            change_ratio <= 0.5,
+            1.0 - (change_ratio - 0.3) * 2,
+            np.maximum(0, 0.6 - (change_ratio - 0.5))
+        )
+    )
+    phrase_scores[note_counts < 3] = 0.5
+
+    return phrase_scores.reshape(-1, NUM_PHRASES).sum(axis=1) / NUM_PHRASES
+
+
+def note_density(population: np.ndarray) -> np.ndarray:
+    """Vectorized JazzFitnessEvaluator._note_density."""
+    density = (population != REST).sum(axis=1) / TOTAL_NOTES
+    return np.where(
+        density < 0.3,
+        density / 0.3 * 0.5,
+        np.where(
+            density <= 0.5,
+            0.5 + (density - 0.3) / 0.2 * 0.5,
+            np.where(
+                density <= 0.75,
+                1.0,
+                np.maximum(0.3, 1.0 - (density - 0.75) * 3)
+            )
+        )
+    )
+
+
+def range_fitness(population: np.ndarray) -> np.ndarray:
+    """Vectorized JazzFitnessEvaluator._range_fitness."""
+    active = population != REST
+    highest = np.where(active, population, np.iinfo(np.int8).min).max(axis=1)
+    lowest = np.where(active, population, np.iinfo(np.int8).max).min(axis=1)
+    range_size = highest.astype(np.int16) - lowest
+
+    # Ideal range is 12-18 semitones (octave to octave and a half)
+    score = np.where(
+        range_size < 8,
+        0.5 + range_size / 16,
+        np.where(
+            range_size <= 18,
+            1.0,
+            np.maximum(0.3, 1.0 - (range_size - 18) / 24)
+        )
+    )
+    score[~active.any(axis=1)] = 0
+    return score
+
+
+# Components that only need the population matrix
+BATCH_COMPONENTS = {
+    'call_and_response': call_and_response,
+    'melodic_motion': melodic_motion,
+    'arpeggio_scale_mix': arpeggio_scale_mix,
+    'phrase_contour': phrase_contour,
+    'note_density': note_density,
+    'range_fitness': range_fitness,
+}
+
+# Components produced together by harmony_scores, in return order
+HARMONY_COMPONENTS = (
+    'chord_tone_emphasis',
+    'tension_usage',
+    'avoid_wrong_notes',
+)
@@ -0,0 +1,380 @@
+"""
+Numba-compiled kernels for the fitness hot path.
+
+Numba is an optional dependency. When it is not installed, ``njit`` is
+replaced by a no-op decorator and ``HAS_NUMBA`` is False, so the evaluator
+falls back to the pure-Python fitness methods.
+
+If build_native.py has been run, the ahead-of-time compiled
+``_fitness_native`` module replaces the JIT versions of score_melody and
+score_population, and Numba is not needed at runtime. ``HAS_COMPILED_KERNEL``
+tells whether the kernels run as native code either way.
+
+Chord membership is passed in as 12-bit pitch-class masks (one per bar),
+where bit ``pc`` is set iff pitch class ``pc`` belongs to the set. A
+membership test is then a single ``(mask >> pc) & 1``.
+
+Melodies are read as MelodyGenome.packed: one uint64 word per bar, with
+one byte per eighth-note slot. Each byte is mapped to its pitch class
+and to its signed pitch through 256-entry lookup tables instead of
+computing ``pitch % 12``.
+
+Numba freezes module-level globals into the compiled code, so the grid
+constants (NUM_BARS, NOTES_PER_BAR, ...) and the lookup tables below are
+compile-time constants: loop bounds are fixed, ``% BARS_PER_PHRASE``
+folds to a mask and table loads need no argument passing. The kernels
+use ``error_model='numpy'``, which drops the division-by-zero checks
+Numba otherwise inserts; every division in them is already guarded.
+"""
+
+import sys
+
+import numpy as np
+
+from src.core import NUM_BARS, NOTES_PER_BAR, TOTAL_NOTES, REST
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit when Numba is not installed."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+# The packed layout relies on a bar filling exactly one 64-bit word
+assert NOTES_PER_BAR == 8, "packed kernels assume 8 slots per bar"
+
+# Pitch class of every byte value (read as int8); REST maps to 12, which
+# is never set in a pitch-class mask
+REST_PC = 12
+PITCH_CLASS_LUT = np.arange(256, dtype=np.uint8).view(np.int8).astype(np.int64) % 12
+PITCH_CLASS_LUT[REST & 0xFF] = REST_PC
+
+# Bit offset of each slot's byte within its bar word
+if sys.byteorder == 'little':
+    SLOT_SHIFTS = np.arange(NOTES_PER_BAR, dtype=np.uint64) * np.uint64(8)
+else:
+    SLOT_SHIFTS = np.arange(NOTES_PER_BAR - 1, -1, -1, dtype=np.uint64) * np.uint64(8)
+
+# Signed value of every byte (the int8 pitch it encodes)
+PITCH_LUT = np.arange(256, dtype=np.uint8).view(np.int8).astype(np.int64)
+
+# Melodic motion: upper interval bound of each bucket and its score
+MOTION_THRESHOLDS = np.array([2, 4, 5, 7, 9])
+MOTION_SCORES = np.array([1.0, 0.9, 0.7, 0.5, 0.3, 0.1])
+# The same staircase as a score per interval; two int8 pitches are at most
+# 255 semitones apart, so any interval indexes it directly
+MOTION_SCORE_LUT = MOTION_SCORES[np.searchsorted(MOTION_THRESHOLDS, np.arange(256))]
+
+# Order of the fitness components computed by score_melody
+KERNEL_COMPONENTS = (
+    'chord_tone_emphasis',
+    'tension_usage',
+    'avoid_wrong_notes',
+    'call_and_response',
+    'melodic_motion',
+    'arpeggio_scale_mix',
+    'phrase_contour',
+    'note_density',
+    'range_fitness',
+)
+
+# Bumped whenever score_melody changes, so a stale native build is ignored
+KERNEL_VERSION = 2
+
+NUM_PHRASES = 4
+BARS_PER_PHRASE = NUM_BARS // NUM_PHRASES
+
+
+@njit(cache=True, error_model='numpy')
+def _phrase_score(note_count, direction_changes):
+    """Contour score of one phrase, as in JazzFitnessEvaluator._phrase_contour."""
+    if note_count < 3:
+        return 0.5
+    change_ratio = direction_changes / (note_count - 2)
+    if change_ratio <= 0.3:
+        return 0.8 + change_ratio * 0.67
+    if change_ratio <= 0.5:
+        return 1.0 - (change_ratio - 0.3) * 2
+    return max(0.0, 0.6 - (change_ratio - 0.5))
+
+
+@njit(cache=True, error_model='numpy')
+def _score_melody(packed, tone_masks, tension_masks, avoid_masks, weights):
+    """
+    Weighted sum of all built-in fitness components in one pass.
+
+    Mirrors the per-genome methods of JazzFitnessEvaluator named in
+    KERNEL_COMPONENTS. Every slot is visited exactly once; components that
+    follow the melody note by note keep the previous notes as running state.
+
+    Args:
+        packed: uint64 array of NUM_BARS bar words (MelodyGenome.packed)
+        tone_masks: uint16 array of NUM_BARS chord-tone pitch-class masks
+        tension_masks: uint16 array of NUM_BARS tension pitch-class masks
+        avoid_masks: uint16 array of NUM_BARS avoid-note pitch-class masks
+        weights: float64 array with one weight per KERNEL_COMPONENTS entry
+
+    Returns:
+        Weighted sum of the component scores
+    """
+    # Harmony
+    strong_score = 0.0
+    strong_checks = 0
+    tension_count = 0
+    total_notes = 0
+    wrong_note_penalty = 0.0
+
+    # Call and response
+    bar_counts = np.zeros(NUM_BARS, dtype=np.int64)
+
+    # Melodic motion and arpeggio-scale mix, over consecutive notes
+    prev_pitch = 0
+    prev_step = 0
+    prev_prev_step = 0
+    motion_score = 0.0
+    step_count = 0
+    arp_up_scale_down = 0
+
+    # Phrase contour, reset at every phrase
+    phrase_total = 0.0
+    phrase_notes = 0
+    phrase_prev_pitch = 0
+    phrase_prev_direction = 0
+    phrase_changes = 0
+
+    # Range
+    lowest = 127
+    highest = -128
+
+    for bar_idx in range(NUM_BARS):
+        if bar_idx % BARS_PER_PHRASE == 0 and bar_idx > 0:
+            phrase_total += _phrase_score(phrase_notes, phrase_changes)
+            phrase_notes = 0
+            phrase_prev_direction = 0
+            phrase_changes = 0
+
+        word = packed[bar_idx]
+        tone_mask = np.int64(tone_masks[bar_idx])
+        tension_mask = np.int64(tension_masks[bar_idx])
+        avoid_mask = np.int64(avoid_masks[bar_idx])
+
+        for pos in range(NOTES_PER_BAR):
+            byte = (word >> SLOT_SHIFTS[pos]) & np.uint64(0xFF)
+            pc = PITCH_CLASS_LUT[byte]
+            if pc == REST_PC:
+                continue
+            pitch = PITCH_LUT[byte]
+
+            is_tone = (tone_mask >> pc) & 1
+            is_tension = (tension_mask >> pc) & 1
+
+            total_notes += 1
+            tension_count += is_tension
+            bar_counts[bar_idx] += 1
+            lowest = min(lowest, pitch)
+            highest = max(highest, pitch)
+
+            if (avoid_mask >> pc) & 1:
+                wrong_note_penalty += 1.0
+            elif not is_tone and not is_tension:
+                wrong_note_penalty += 0.3
+
+            # Strong beats: beat 1 and beat 3 of the eighth-note grid
+            if pos == 0 or pos == 4:
+                strong_checks += 1
+                if is_tone:
+                    strong_score += 1.0
+                elif is_tension:
+                    strong_score += 0.5
+
+            if total_notes > 1:
+                step = pitch - prev_pitch
+                interval = abs(step)
+                motion_score += MOTION_SCORE_LUT[interval]
+                step_count += interval <= 2
+
+                # Arpeggio up, scale down: skip up of 3+, then two steps down
+                if (
+                    total_notes >= 4 and prev_prev_step >= 3
+                    and -2 <= prev_step <= -1 and -2 <= step <= -1
+                ):
+                    arp_up_scale_down += 1
+                prev_prev_step = prev_step
+                prev_step = step
+            prev_pitch = pitch
+
+            if phrase_notes > 0:
+                direction = np.sign(pitch - phrase_prev_pitch)
+                if direction * phrase_prev_direction < 0:
+                    phrase_changes += 1
+                phrase_prev_direction = direction
+            phrase_notes += 1
+            phrase_prev_pitch = pitch
+
+    phrase_total += _phrase_score(phrase_notes, phrase_changes)
+
+    # Chord tone emphasis, tension usage, avoid wrong notes
+    chord_tone_emphasis = strong_score / strong_checks if strong_checks > 0 else 0.5
+
+    if total_notes == 0:
+        tension_usage = 0.0
+        avoid_wrong_notes = 0.5
+    else:
+        tension_ratio = tension_count / total_notes
+        if tension_ratio <= 0.30:
+            tension_usage = tension_ratio / 0.30
+        else:
+            tension_usage = max(0.0, 1 - ((tension_ratio - 0.30) / 0.4))
+        avoid_wrong_notes = 1 - (wrong_note_penalty / total_notes)
+
+    # Call and response
+    phrase_length = BARS_PER_PHRASE * NOTES_PER_BAR
+    call = (bar_counts[0] + bar_counts[1]) / phrase_length
+    breath = (bar_counts[2] + bar_counts[3]) / phrase_length
+    response = (bar_counts[4] + bar_counts[5]) / phrase_length
+    resolution = (bar_counts[6] + bar_counts[7]) / phrase_length
+
+    call_and_response = 0.0
+    if 0.4 <= call <= 0.7:
+        call_and_response += 0.25
+    elif 0.3 <= call <= 0.8:
+        call_and_response += 0.15
+    if 0.2 <= breath <= 0.5:
+        call_and_response += 0.25
+    elif breath < call:
+        call_and_response += 0.15
+    if 0.4 <= response <= 0.7:
+        call_and_response += 0.25
+    elif 0.3 <= response <= 0.8:
+        call_and_response += 0.15
+    if bar_counts[6] > bar_counts[7]:
+        call_and_response += 0.25
+    elif 0.2 <= resolution <= 0.6:
+        call_and_response += 0.15
+
+    # Melodic motion
+    melodic_motion = motion_score / (total_notes - 1) if total_notes > 1 else 0.5
+
+    # Arpeggio-scale mix: ideal ratio is about 60% steps, 40% skips
+    if total_notes < 4:
+        arpeggio_scale_mix = 0.5
+    else:
+        step_ratio = step_count / (total_notes - 1)
+        ratio_score = max(0.0, 1.0 - abs(0.6 - step_ratio) * 2)
+        pattern_score = min(1.0, arp_up_scale_down / max((total_notes - 3) // 4, 1))
+        arpeggio_scale_mix = 0.6 * ratio_score + 0.4 * pattern_score
+
+    # Phrase contour
+    phrase_contour = phrase_total / NUM_PHRASES
+
+    # Note density
+    density = total_notes / TOTAL_NOTES
+    if density < 0.3:
+        note_density = density / 0.3 * 0.5
+    elif density <= 0.5:
+        note_density = 0.5 + (density - 0.3) / 0.2 * 0.5
+    elif density <= 0.75:
+        note_density = 1.0
+    else:
+        note_density = max(0.3, 1.0 - (density - 0.75) * 3)
+
+    # Range: ideal is 12-18 semitones
+    if total_notes == 0:
+        range_fitness = 0.0
+    else:
+        range_size = highest - lowest
+        if range_size < 8:
+            range_fitness = 0.5 + range_size / 16
+        elif range_size <= 18:
+            range_fitness = 1.0
+        else:
+            range_fitness = max(0.3, 1.0 - (range_size - 18) / 24)
+
+    return (
+        weights[0] * chord_tone_emphasis
+        + weights[1] * tension_usage
+        + weights[2] * avoid_wrong_notes
+        + weights[3] * call_and_response
+        + weights[4] * melodic_motion
+        + weights[5] * arpeggio_scale_mix
+        + weights[6] * phrase_contour
+        + weights[7] * note_density
+        + weights[8] * range_fitness
+    )
+
+
+@njit(cache=True, error_model='numpy')
+def _score_population(packed_population, tone_masks, tension_masks, avoid_masks, weights):
+    """
+    Score every genome of a population in one compiled call.
+
+    The loop is deliberately serial. The kernel is called from several
+    job and request threads at once, and Numba's default workqueue
+    threading layer aborts the process on concurrent parallel regions.
+    At population sizes of ~100 a parallel loop is slower anyway.
+
+    Args:
+        packed_population: uint64 matrix of shape (P, NUM_BARS), the int8
+            population matrix viewed as bar words
+        tone_masks, tension_masks, avoid_masks, weights: As for score_melody
+
+    Returns:
+        float64 array of P weighted scores
+    """
+    scores = np.empty(packed_population.shape[0])
+    for i in range(packed_population.shape[0]):
+        scores[i] = _score_melody(
+            packed_population[i], tone_masks, tension_masks, avoid_masks, weights
+        )
+    return scores
+
+
+@njit(cache=True, error_model='numpy')
+def _kernel_version():
+    """KERNEL_VERSION as compiled into the kernel module."""
+    return KERNEL_VERSION
+
+
+# Prefer the ahead-of-time compiled kernels built by build_native.py, as
+# long as they were built from this version of the kernel
+try:
+    from ._fitness_native import kernel_version, score_melody, score_population
+    HAS_NATIVE = kernel_version() == KERNEL_VERSION
+except ImportError:
+    HAS_NATIVE = False
+if not HAS_NATIVE:
+    score_melody = _score_melody
+    score_population = _score_population
+
+HAS_COMPILED_KERNEL = HAS_NUMBA or HAS_NATIVE
+
+
+# Set by the first warmup() call
+_warmed_up = False
+
+
+def warmup():
+    """
+    Compile the kernels ahead of the first request.
+
+    Server entry points call this at import time so that each worker
+    process pays the JIT cost once, before it starts serving, and every
+    JazzFitnessEvaluator calls it too; only the first call does any work.
+    There is nothing to do when the native module is in use or Numba is
+    missing.
+    """
+    global _warmed_up
+    if _warmed_up or HAS_NATIVE or not HAS_NUMBA:
+        return
+    masks = np.zeros(NUM_BARS, dtype=np.uint16)
+    weights = np.zeros(len(KERNEL_COMPONENTS))
+    packed = np.full((1, NUM_BARS * NOTES_PER_BAR), REST, dtype=np.int8).view(np.uint64)
+    score_melody(packed[0], masks, masks, masks, weights)
+    score_population(packed, masks, masks, masks, weights)
+    _warmed_up = True
@@ -0,0 +1,77 @@
+"""
+Numba-compiled kernel for similarity-based pairing.
+
+Like _fitness_numba, Numba is optional. The ahead-of-time compiled kernel
+from build_native.py is preferred when it has been built from the current
+KERNEL_VERSION; otherwise the JIT kernel is used, and without Numba the
+similarity matrix is computed with NumPy broadcasting.
+"""
+
+import numpy as np
+
+from src.core import TOTAL_NOTES
+from ._fitness_numba import HAS_NATIVE, HAS_NUMBA, njit
+
+
+@njit(cache=True)
+def _similarity_matrix(pitch_matrix):
+    """
+    Compiled similarity_matrix.
+
+    Serial for the same reason as score_population: it runs on concurrent
+    job threads, where parallel regions are unsafe.
+    """
+    num_genomes, num_slots = pitch_matrix.shape
+    out = np.empty((num_genomes, num_genomes), dtype=np.int64)
+    for i in range(num_genomes):
+        for j in range(num_genomes):
+            matches = 0
+            for k in range(num_slots):
+                matches += pitch_matrix[i, k] == pitch_matrix[j, k]
+            out[i, j] = matches
+    return out
+
+
+# Prefer the ahead-of-time compiled kernel, under the same version check
+# as the fitness kernels; builds from before the pairing kernel was added
+# do not export it
+HAS_NATIVE_SIMILARITY = False
+if HAS_NATIVE:
+    try:
+        from ._fitness_native import similarity_matrix as _native_similarity_matrix
+        HAS_NATIVE_SIMILARITY = True
+    except ImportError:
+        pass
+
+
+def similarity_matrix(pitch_matrix: np.ndarray) -> np.ndarray:
+    """
+    Count matching pitch positions between every pair of genomes.
+
+    Args:
+        pitch_matrix: int8 matrix of shape (N, TOTAL_NOTES), one genome
+            per row
+
+    Returns:
+        int64 matrix of shape (N, N) where entry [i, j] is the number of
+        slots in which genomes i and j hold the same pitch (or both rest)
+    """
+    if HAS_NATIVE_SIMILARITY:
+        return _native_similarity_matrix(pitch_matrix)
+    if HAS_NUMBA:
+        return _similarity_matrix(pitch_matrix)
+    return np.count_nonzero(
+        pitch_matrix[:, np.newaxis, :] == pitch_matrix[np.newaxis, :, :], axis=2
+    )
+
+
+def warmup():
+    """
+    Compile the similarity kernel ahead of the first request.
+
+    Server entry points call this next to _fitness_numba.warmup(). There
+    is nothing to do when the native kernel is in use or Numba is missing.
+    """
+    if HAS_NATIVE_SIMILARITY or not HAS_NUMBA:
+        return
+    _similarity_matrix(np.zeros((1, TOTAL_NOTES), dtype=np.int8))
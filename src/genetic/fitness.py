@@ -4,14 +4,45 @@ Fitness evaluation for jazz melodies.
 This module provides the JazzFitnessEvaluator class which evaluates the
 musical quality of generated melodies against chord progressions using
 multiple weighted fitness functions.
+
+Performance notes:
+    Scoring is compute-bound. A genome is 64 int8 slots and the per-bar
+    chord masks are a few dozen bytes, so an evaluation's working set
+    (well under 256 B) sits in L1 cache. evaluate() does roughly
+    TOTAL_NOTES x (number of components) operations per call, and the
+    GA makes it population_size x generations times. Memory bandwidth is
+    not the bottleneck; instruction count and branches are. When
+    optimizing, prefer changes that remove work per slot (bitmask
+    membership tests, compiled kernels, packed words, whole-population
+    NumPy passes) over data-layout changes aimed at bandwidth. Functions
+    on this path are tagged with @hot_path.
+
+    With Numba, evaluate_population() scores the whole population in one
+    serial compiled call. Neither threads inside the kernel nor worker
+    processes are used. A population is a few KB and is scored in well
+    under a millisecond, less than the cost of fanning it out. The kernel
+    also runs on concurrent job threads, which Numba's default threading
+    layer does not allow for parallel regions.
 """
 
+from collections import OrderedDict
 from typing import Optional
 
+import numpy as np
+
 from src.core import (
-    NUM_BARS, NOTES_PER_BAR, REST,
+    NOTES_PER_BAR, TOTAL_NOTES, REST,
+    NOTE_OTHER, NOTE_CHORD_TONE, NOTE_TENSION, NOTE_AVOID,
     JazzChord, ChordProgression, MelodyGenome
 )
+from ._fitness_batch import (
+    BATCH_COMPONENTS, HARMONY_COMPONENTS, MOTION_SCORE_LUT,
+    STRONG_BEATS, classify_notes, harmony_scores, slot_note_classes
+)
+from ._fitness_numba import (
+    HAS_COMPILED_KERNEL, KERNEL_COMPONENTS,
+    score_melody, score_population, warmup
+)
 
 
 # =============================================================================
@@ -81,6 +112,17 @@ FITNESS_WEIGHTS_CONFIG = [
 ]
 
 
+def hot_path(func):
+    """
+    Mark a function as part of the fitness hot path.
+    
+    A no-op apart from setting ``func.__hot__ = True``, so profiler users
+    (scalene, py-spy) can locate the scoring entry points quickly.
+    """
+    func.__hot__ = True
+    return func
+
+
 def get_default_weights() -> dict[str, float]:
     """Get default weights dictionary from config."""
     return {item['key']: item['default'] for item in FITNESS_WEIGHTS_CONFIG}
@@ -105,15 +147,30 @@ class JazzFitnessEvaluator:
         5. Phrase structure - Coherent musical phrases
         6. Range and playability - Practical considerations
     
+    When the compiled kernel is available (Numba, or the module built by
+    build_native.py), all nine built-in components (KERNEL_COMPONENTS)
+    are scored together by score_melody in a single pass over the packed
+    genome, using per-bar pitch-class masks. The pure-Python methods below
+    then only handle components outside KERNEL_COMPONENTS. Without a
+    compiled kernel, evaluate() uses those methods for everything, and
+    evaluate_population() uses the NumPy batch functions.
+    
+    evaluate() memoizes scores in a bounded LRU cache keyed by the genome's
+    pitch bytes, so elites and duplicate offspring are not scored twice.
+    
     Attributes:
         progression: The chord progression to evaluate against
         weights: Dictionary mapping fitness function names to their weights
+        cache_size: Maximum number of scores kept in the fitness cache
+        cache_hits: Number of evaluate() calls answered from the cache
+        cache_misses: Number of evaluate() calls that computed a score
     """
     
     def __init__(
         self,
         progression: ChordProgression,
-        weights: Optional[dict[str, float]] = None
+        weights: Optional[dict[str, float]] = None,
+        cache_size: int = 4096
     ):
         """
         Initialize the fitness evaluator.
@@ -122,12 +179,48 @@ class JazzFitnessEvaluator:
             progression: The chord progression to evaluate melodies against
             weights: Optional custom weights for fitness functions. If not
                 provided, default weights optimized for jazz are used.
+            cache_size: Maximum number of cached fitness scores (default: 4096)
         """
         self.progression = progression
         
         # Default weights from centralized config
         self.weights = weights or get_default_weights()
+        
+        # LRU cache of genome bytes -> fitness score
+        self.cache_size = cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache: OrderedDict[bytes, float] = OrderedDict()
+        
+        # Per-bar pitch-class masks for the compiled kernel
+        chords = progression.chords
+        self._tone_masks = np.array(
+            [c.chord_tone_pc_mask for c in chords], dtype=np.uint16
+        )
+        self._tension_masks = np.array(
+            [c.tension_pc_mask for c in chords], dtype=np.uint16
+        )
+        self._avoid_masks = np.array(
+            [c.avoid_pc_mask for c in chords], dtype=np.uint16
+        )
+        self._kernel_weights = np.array(
+            [self.weights.get(func, 0.0) for func in KERNEL_COMPONENTS],
+            dtype=np.float64
+        )
+        self._python_components = [
+            func for func in self.weights if func not in KERNEL_COMPONENTS
+        ]
+        
+        # Note class of every pitch class, expanded to one row per slot
+        self._slot_classes = slot_note_classes(progression.note_class_table)
+        # Genome bytes and note class counts of the last _harmony_stats() call
+        self._harmony_memo: Optional[tuple[bytes, tuple]] = None
+        
+        # Trigger JIT compilation now rather than on the first evaluation;
+        # a no-op once the kernels have been warmed in this process
+        warmup()
     
+    @hot_path
     def evaluate(self, genome: MelodyGenome) -> float:
         """
         Calculate the overall fitness score for a melody genome.
@@ -138,43 +231,149 @@ class JazzFitnessEvaluator:
         Returns:
             Float between 0 and 1 representing fitness (higher is better)
         """
-        total = sum(
-            self.weights[func] * getattr(self, f"_{func}")(genome)
-            for func in self.weights
-        )
+        # The raw 64 bytes are an exact key; the bytes object caches its
+        # hash, so get/move_to_end/insert hash it only once per call
+        key = genome.pitches.tobytes()
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return cached
+        
+        self.cache_misses += 1
+        total = self._compute_fitness(genome)
+        
+        self._cache[key] = total
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
         return total
     
+    @hot_path
+    def _compute_fitness(self, genome: MelodyGenome) -> float:
+        """Compute the weighted fitness score without consulting the cache."""
+        if not HAS_COMPILED_KERNEL:
+            return sum(
+                self.weights[func] * getattr(self, f"_{func}")(genome)
+                for func in self.weights
+            )
+        
+        total = self._score_kernel(genome)
+        for func in self._python_components:
+            total += self.weights[func] * getattr(self, f"_{func}")(genome)
+        return total
+    
+    @hot_path
+    def evaluate_population(self, population: np.ndarray) -> np.ndarray:
+        """
+        Calculate fitness scores for a whole population at once.
+        
+        With a compiled kernel, built-in components are computed by it in a
+        single call; otherwise with vectorized NumPy operations
+        over the entire population. Any other configured component falls
+        back to its per-genome method.
+        
+        Args:
+            population: int8 matrix of shape (P, TOTAL_NOTES), one genome
+                per row
+            
+        Returns:
+            Float array of P fitness scores (same values as evaluate())
+        """
+        population = np.ascontiguousarray(population, dtype=np.int8)
+        
+        if HAS_COMPILED_KERNEL:
+            totals = score_population(
+                population.view(np.uint64),
+                self._tone_masks,
+                self._tension_masks,
+                self._avoid_masks,
+                self._kernel_weights
+            )
+            components = self._python_components
+        else:
+            totals = np.zeros(len(population))
+            components = list(self.weights)
+        
+        if any(func in components for func in HARMONY_COMPONENTS):
+            harmony = dict(zip(
+                HARMONY_COMPONENTS,
+                harmony_scores(population, self._slot_classes)
+            ))
+        
+        for func in components:
+            weight = self.weights[func]
+            if func in HARMONY_COMPONENTS:
+                totals += weight * harmony[func]
+            elif func in BATCH_COMPONENTS:
+                totals += weight * BATCH_COMPONENTS[func](population)
+            else:
+                method = getattr(self, f"_{func}")
+                totals += weight * np.array([
+                    method(MelodyGenome(pitches=row)) for row in population
+                ])
+        
+        return totals
+    
+    @hot_path
+    def _score_kernel(self, genome: MelodyGenome) -> float:
+        """Score the built-in components with the compiled kernel."""
+        return score_melody(
+            genome.packed,
+            self._tone_masks,
+            self._tension_masks,
+            self._avoid_masks,
+            self._kernel_weights
+        )
+    
     def get_best_genome(self, genomes: list[MelodyGenome]) -> MelodyGenome:
         """Return the genome with the highest fitness score."""
         return max(genomes, key=self.evaluate)
     
     def _get_pitch_class(self, midi_pitch: int) -> int:
         """Convert MIDI pitch to pitch class (0-11)."""
-        return midi_pitch % 12
+        return int(midi_pitch) % 12
     
     def _is_chord_tone(self, pitch: int, chord: JazzChord) -> bool:
         """Check if a pitch is a chord tone of the given chord."""
         if pitch == REST:
             return False
-        pc = self._get_pitch_class(pitch)
-        relative_pc = (pc - chord.root) % 12
-        return relative_pc in chord.chord_tones
+        return chord.is_chord_tone_pc(self._get_pitch_class(pitch))
     
     def _is_tension(self, pitch: int, chord: JazzChord) -> bool:
         """Check if a pitch is an available tension of the given chord."""
         if pitch == REST:
             return False
-        pc = self._get_pitch_class(pitch)
-        relative_pc = (pc - chord.root) % 12
-        return relative_pc in chord.tensions
+        return chord.is_tension_pc(self._get_pitch_class(pitch))
     
     def _is_avoid_note(self, pitch: int, chord: JazzChord) -> bool:
         """Check if a pitch should be avoided against the given chord."""
         if pitch == REST:
             return False
-        pc = self._get_pitch_class(pitch)
-        relative_pc = (pc - chord.root) % 12
-        return relative_pc in chord.avoid_notes
+        return chord.is_avoid_pc(self._get_pitch_class(pitch))
+    
+    def _harmony_stats(self, genome: MelodyGenome) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Count the notes of a genome per note class in a single sweep.
+        
+        The three harmony components share these counts; the result for the
+        most recent genome is kept, so scoring a genome classifies it once.
+        
+        Returns:
+            Tuple of (counts, strong_counts), each indexed by NOTE_* value:
+            notes of each class over all slots and over strong beats only
+        """
+        key = genome.pitches.tobytes()
+        if self._harmony_memo is not None and self._harmony_memo[0] == key:
+            return self._harmony_memo[1]
+        
+        # One bin per (strong beat, note class), plus a bin for rests
+        classes = classify_notes(genome.pitches, self._slot_classes)
+        bins = np.where(genome.active_mask, classes + 4 * STRONG_BEATS, 8)
+        counts = np.bincount(bins, minlength=9)
+        stats = (counts[:4] + counts[4:8], counts[4:8])
+        
+        self._harmony_memo = (key, stats)
+        return stats
     
     def _chord_tone_emphasis(self, genome: MelodyGenome) -> float:
         """
@@ -187,26 +386,15 @@ class JazzFitnessEvaluator:
         Returns:
             Score between 0 and 1
         """
-        score = 0
-        checks = 0
+        # Strong beats: positions 0 (beat 1) and 4 (beat 3) in eighth-note grid
+        _, strong = self._harmony_stats(genome)
+        checks = int(strong.sum())
+        if checks == 0:
+            return 0.5
         
-        for bar_idx in range(NUM_BARS):
-            chord = self.progression.chords[bar_idx]
-            bar = genome.get_bar(bar_idx)
-            
-            # Strong beats: positions 0 (beat 1) and 4 (beat 3) in eighth-note grid
-            strong_beat_positions = [0, 4]
-            
-            for pos in strong_beat_positions:
-                pitch = bar[pos]
-                if pitch != REST:
-                    checks += 1
-                    if self._is_chord_tone(pitch, chord):
-                        score += 1
-                    elif self._is_tension(pitch, chord):
-                        score += 0.5  # Tensions on strong beats are acceptable
-        
-        return score / checks if checks > 0 else 0.5
+        # Tensions on strong beats are acceptable
+        score = strong[NOTE_CHORD_TONE] + 0.5 * strong[NOTE_TENSION]
+        return float(score) / checks
     
     def _tension_usage(self, genome: MelodyGenome) -> float:
         """
@@ -219,23 +407,13 @@ class JazzFitnessEvaluator:
         Returns:
             Score between 0 and 1
         """
-        tension_count = 0
-        total_notes = 0
-        
-        for bar_idx in range(NUM_BARS):
-            chord = self.progression.chords[bar_idx]
-            bar = genome.get_bar(bar_idx)
-            
-            for pitch in bar:
-                if pitch != REST:
-                    total_notes += 1
-                    if self._is_tension(pitch, chord):
-                        tension_count += 1
+        counts, _ = self._harmony_stats(genome)
+        total_notes = int(counts.sum())
         
         if total_notes == 0:
             return 0
         
-        tension_ratio = tension_count / total_notes
+        tension_ratio = int(counts[NOTE_TENSION]) / total_notes
         
         # Score peaks at 30% and decreases on either side
         optimal = 0.30
@@ -256,27 +434,16 @@ class JazzFitnessEvaluator:
         Returns:
             Score between 0 and 1 (higher means fewer wrong notes)
         """
-        wrong_note_penalty = 0
-        total_notes = 0
-        
-        for bar_idx in range(NUM_BARS):
-            chord = self.progression.chords[bar_idx]
-            bar = genome.get_bar(bar_idx)
-            
-            for pitch in bar:
-                if pitch != REST:
-                    total_notes += 1
-                    
-                    if self._is_avoid_note(pitch, chord):
-                        wrong_note_penalty += 1.0  # Heavy penalty
-                    elif not self._is_chord_tone(pitch, chord) and \
-                         not self._is_tension(pitch, chord):
-                        # Chromatic passing tone - mild penalty
-                        wrong_note_penalty += 0.3
+        counts, _ = self._harmony_stats(genome)
+        total_notes = int(counts.sum())
         
         if total_notes == 0:
             return 0.5
         
+        # Heavy penalty for avoid notes, mild penalty for chromatic passing
+        # tones (neither chord tones nor tensions)
+        wrong_note_penalty = int(counts[NOTE_AVOID]) + 0.3 * int(counts[NOTE_OTHER])
+        
         max_penalty = total_notes
         return 1 - (wrong_note_penalty / max_penalty)
     
@@ -296,16 +463,11 @@ class JazzFitnessEvaluator:
         Returns:
             Score between 0 and 1
         """
-        # Calculate density for each 2-bar phrase
-        phrase_densities = []
-        for phrase_idx in range(4):
-            start_bar = phrase_idx * 2
-            note_count = 0
-            for bar_idx in range(start_bar, start_bar + 2):
-                bar = genome.get_bar(bar_idx)
-                note_count += sum(1 for p in bar if p != REST)
-            density = note_count / (2 * NOTES_PER_BAR)
-            phrase_densities.append(density)
+        # Count notes per bar, then calculate density for each 2-bar phrase
+        bar_counts = np.count_nonzero(genome.bars != REST, axis=1)
+        phrase_densities = (
+            bar_counts.reshape(4, 2).sum(axis=1) / (2 * NOTES_PER_BAR)
+        ).tolist()
         
         score = 0
         
@@ -332,12 +494,7 @@ class JazzFitnessEvaluator:
         
         # Phrase 4 (bars 7-8): Resolution - can vary
         # Should have some activity but end with space
-        bar7 = genome.get_bar(6)
-        bar8 = genome.get_bar(7)
-        bar7_density = sum(1 for p in bar7 if p != REST) / NOTES_PER_BAR
-        bar8_density = sum(1 for p in bar8 if p != REST) / NOTES_PER_BAR
-        
-        if bar7_density > bar8_density:  # Winding down
+        if bar_counts[6] > bar_counts[7]:  # Winding down
             score += 0.25
         elif 0.2 <= phrase_densities[3] <= 0.6:
             score += 0.15
@@ -356,32 +513,15 @@ class JazzFitnessEvaluator:
         Returns:
             Score between 0 and 1
         """
-        score = 0
-        intervals = 0
-        
-        prev_pitch = None
-        for pitch in genome.pitches:
-            if pitch != REST:
-                if prev_pitch is not None:
-                    interval = abs(pitch - prev_pitch)
-                    intervals += 1
-                    
-                    if interval <= 2:  # Step (minor/major 2nd)
-                        score += 1.0
-                    elif interval <= 4:  # Third
-                        score += 0.9
-                    elif interval <= 5:  # Fourth
-                        score += 0.7
-                    elif interval <= 7:  # Fifth
-                        score += 0.5
-                    elif interval <= 9:  # Sixth
-                        score += 0.3
-                    else:  # Larger leaps
-                        score += 0.1
-                
-                prev_pitch = pitch
-        
-        return score / intervals if intervals > 0 else 0.5
+        pitches = genome.active_pitches.astype(np.int16)
+        
+        if len(pitches) < 2:
+            return 0.5
+        
+        # Steps (2nds) score 1.0, thirds 0.9, fourths 0.7, fifths 0.5,
+        # sixths 0.3 and larger leaps 0.1
+        intervals = np.abs(np.diff(pitches))
+        return float(MOTION_SCORE_LUT[intervals].mean())
     
     def _arpeggio_scale_mix(self, genome: MelodyGenome) -> float:
         """
@@ -398,38 +538,23 @@ class JazzFitnessEvaluator:
         Returns:
             Score between 0 and 1
         """
-        skip_count = 0
-        step_count = 0
-        arp_up_scale_down = 0
-        patterns = 0
-        
-        pitches = [p for p in genome.pitches if p != REST]
+        pitches = genome.active_pitches.astype(np.int16)
         
         if len(pitches) < 4:
             return 0.5
         
-        for i in range(1, len(pitches)):
-            interval = abs(pitches[i] - pitches[i-1])
-            if interval <= 2:
-                step_count += 1
-            elif interval >= 3:
-                skip_count += 1
+        # Every movement is either a step (2 semitones or less) or a skip
+        steps = np.diff(pitches)
+        step_count = np.count_nonzero(np.abs(steps) <= 2)
+        total_movements = len(steps)
         
-        # Look for "arpeggio up, scale down" patterns
-        for i in range(len(pitches) - 3):
-            p1, p2, p3, p4 = pitches[i:i+4]
-            
-            # Skip up (3+ semitones), then steps down
-            if p2 > p1 and (p2 - p1) >= 3:  # Skip up
-                if p3 < p2 and (p2 - p3) <= 2:  # Step down
-                    if p4 < p3 and (p3 - p4) <= 2:  # Another step down
-                        arp_up_scale_down += 1
-            patterns += 1
-        
-        # Calculate scores
-        total_movements = step_count + skip_count
-        if total_movements == 0:
-            return 0.5
+        # Look for "arpeggio up, scale down" patterns: a skip up (3+
+        # semitones), then two steps down
+        step_down = (steps <= -1) & (steps >= -2)
+        arp_up_scale_down = np.count_nonzero(
+            (steps[:-2] >= 3) & step_down[1:-1] & step_down[2:]
+        )
+        patterns = len(pitches) - 3
         
         # Ideal ratio: about 60% steps, 40% skips
         step_ratio = step_count / total_movements
@@ -453,45 +578,38 @@ class JazzFitnessEvaluator:
         Returns:
             Score between 0 and 1
         """
-        phrase_scores = []
+        # Notes of the melody in order, with the 2-bar phrase each belongs to
+        note_slots = np.flatnonzero(genome.active_mask)
+        pitches = genome.pitches[note_slots].astype(np.int16)
+        phrase_of_note = note_slots // (2 * NOTES_PER_BAR)
+        note_counts = np.bincount(phrase_of_note, minlength=4).tolist()
+        
+        # Direction of each movement; movements that cross into the next
+        # phrase count as flat, so they never form a direction change
+        directions = np.sign(np.diff(pitches))
+        directions[phrase_of_note[1:] != phrase_of_note[:-1]] = 0
+        changes = directions[:-1] * directions[1:] < 0
+        change_counts = np.bincount(
+            phrase_of_note[1:-1][changes], minlength=4
+        ).tolist()
         
-        for phrase_idx in range(4):
-            start_bar = phrase_idx * 2
-            phrase_pitches = []
-            
-            for bar_idx in range(start_bar, start_bar + 2):
-                phrase_pitches.extend(genome.get_bar(bar_idx))
-            
-            actual_pitches = [p for p in phrase_pitches if p != REST]
-            
-            if len(actual_pitches) < 3:
+        phrase_scores = []
+        for note_count, direction_changes in zip(note_counts, change_counts):
+            if note_count < 3:
                 phrase_scores.append(0.5)
                 continue
             
-            # Calculate direction changes
-            direction_changes = 0
-            for i in range(1, len(actual_pitches) - 1):
-                prev_dir = actual_pitches[i] - actual_pitches[i-1]
-                next_dir = actual_pitches[i+1] - actual_pitches[i]
-                
-                if (prev_dir > 0 and next_dir < 0) or \
-                   (prev_dir < 0 and next_dir > 0):
-                    direction_changes += 1
-            
             # Fewer direction changes = more coherent contour
-            max_changes = len(actual_pitches) - 2
-            if max_changes > 0:
-                change_ratio = direction_changes / max_changes
-                if change_ratio <= 0.3:
-                    phrase_scores.append(0.8 + change_ratio * 0.67)
-                elif change_ratio <= 0.5:
-                    phrase_scores.append(1.0 - (change_ratio - 0.3) * 2)
-                else:
-                    phrase_scores.append(max(0, 0.6 - (change_ratio - 0.5)))
+            max_changes = note_count - 2
+            change_ratio = direction_changes / max_changes
+            if change_ratio <= 0.3:
+                phrase_scores.append(0.8 + change_ratio * 0.67)
+            elif change_ratio <= 0.5:
+                phrase_scores.append(1.0 - (change_ratio - 0.3) * 2)
             else:
-                phrase_scores.append(0.5)
+                phrase_scores.append(max(0, 0.6 - (change_ratio - 0.5)))
         
-        return sum(phrase_scores) / len(phrase_scores) if phrase_scores else 0.5
+        return sum(phrase_scores) / len(phrase_scores)
     
     def _note_density(self, genome: MelodyGenome) -> float:
         """
@@ -504,9 +622,7 @@ class JazzFitnessEvaluator:
         Returns:
             Score between 0 and 1
         """
-        from src.core import TOTAL_NOTES
-        
-        note_count = sum(1 for p in genome.pitches if p != REST)
+        note_count = np.count_nonzero(genome.active_mask)
         density = note_count / TOTAL_NOTES
         
         if density < 0.3:
@@ -529,14 +645,12 @@ class JazzFitnessEvaluator:
         Returns:
             Score between 0 and 1
         """
-        pitches = [p for p in genome.pitches if p != REST]
+        pitches = genome.active_pitches
         
-        if not pitches:
+        if len(pitches) == 0:
             return 0
         
-        min_pitch = min(pitches)
-        max_pitch = max(pitches)
-        range_size = max_pitch - min_pitch
+        range_size = int(pitches.max()) - int(pitches.min())
         
         # Ideal range is 12-18 semitones (octave to octave and a half)
         if range_size < 8:
@@ -545,3 +659,4 @@ class JazzFitnessEvaluator:
             return 1.0  # Optimal
         else:
             return max(0.3, 1.0 - (range_size - 18) / 24)  # Too wide
+
@@ -7,14 +7,18 @@ for musical applications.
 """
 
 import random
+from collections.abc import Callable
+
+import numpy as np
 
 from src.core import (
     REST, MIN_PITCH, MAX_PITCH,
     NUM_BARS, NOTES_PER_BAR, TOTAL_NOTES,
-    JazzChord, ChordProgression, MelodyGenome
+    ChordProgression, MelodyGenome
 )
 from .fitness import JazzFitnessEvaluator
-from .pairing import PairingStrategy, resolve_pairing_strategy
+from ._fitness_batch import STRONG_BEATS
+from .pairing import ParentPool, PairingStrategy, resolve_pairing_strategy
 
 
 class GeneticJazzMelodyGenerator:
@@ -62,7 +66,12 @@ class GeneticJazzMelodyGenerator:
             mutation_rate: Probability of mutation per genome (default: 0.1)
             elite_size: Number of elite genomes to preserve (default: 5)
             pairing_strategy: Strategy name or callable for pairing parents (default: "random")
+            
+        Raises:
+            ValueError: If population_size is less than 1
         """
+        if population_size < 1:
+            raise ValueError(f"population_size must be at least 1, got {population_size}")
         self.progression = progression
         self.fitness_evaluator = fitness_evaluator
         self.population_size = population_size
@@ -70,173 +79,218 @@ class GeneticJazzMelodyGenerator:
         self.elite_size = elite_size
         self.pairing_strategy = resolve_pairing_strategy(pairing_strategy)
         self._population: list[MelodyGenome] = []
+        # Population matrix; the genomes above are views of its rows
+        self._pop_array = np.empty((0, TOTAL_NOTES), dtype=np.int8)
+        # Seeded from the random module so random.seed() still reproduces runs
+        self._rng = np.random.default_rng(random.getrandbits(64))
+        self._chord_tone_pitches, self._chord_tone_counts = (
+            progression.chord_tone_pitch_table
+        )
     
-    def generate(self, generations: int = 500) -> MelodyGenome:
+    def generate(
+        self,
+        generations: int = 500,
+        on_progress: Callable[[int, float], bool | None] | None = None
+    ) -> MelodyGenome:
         """
         Generate a melody using the genetic algorithm.
         
         Args:
             generations: Number of generations to evolve (default: 500)
+            on_progress: Optional callback invoked after each generation is
+                evaluated, with the generation number (1-based) and the best
+                fitness so far. Returning False stops the evolution early.
             
         Returns:
             The best melody genome found after evolution
         """
-        self._population = self._initialize_population()
+        self._set_population(self._initialize_population())
+        elite_scores = np.empty(0)
+        
+        # Second population buffer, with a genome view of every row; each
+        # generation is bred into it and then the two buffers swap roles
+        next_array = np.empty_like(self._pop_array)
+        next_population = [MelodyGenome(pitches=row) for row in next_array]
+        
+        num_elite = max(0, min(self.elite_size, self.population_size))
+        num_children = self.population_size - num_elite
         
         for gen in range(generations):
-            # Evaluate and sort by fitness
-            fitness_scores = [
-                (genome, self.fitness_evaluator.evaluate(genome))
-                for genome in self._population
-            ]
-            fitness_scores.sort(key=lambda x: x[1], reverse=True)
+            # Evaluate the whole population in one pass and rank by fitness.
+            # The elites lead the population unchanged, so their scores from
+            # the previous generation are reused and only children are scored
+            scores = np.concatenate((
+                elite_scores,
+                self.fitness_evaluator.evaluate_population(
+                    self._pop_array[len(elite_scores):]
+                )
+            ))
+            ranking = np.argsort(-scores, kind='stable')
             
-            # Elitism: Keep top performers
-            new_population = [
-                genome.copy() for genome, _ in fitness_scores[:self.elite_size]
-            ]
-
-            fitness_by_id = {id(genome): score for genome, score in fitness_scores}
+            if on_progress is not None:
+                if on_progress(gen + 1, float(scores[ranking[0]])) is False:
+                    break
             
-            # Select parents and create new population
-            parents = self._select_parents()
-            parents.sort(
-                key=lambda genome: fitness_by_id.get(id(genome), 0.0),
-                reverse=True
-            )
+            # Elitism: Keep top performers
+            elite = ranking[:num_elite]
+            next_array[:num_elite] = self._pop_array[elite]
+            elite_scores = scores[elite]
             
-            while len(new_population) < self.population_size:
-                parent1, parent2 = self.pairing_strategy(parents)
-                child1 = self._crossover(parent1, parent2)
-                child2 = self._crossover(parent2, parent1)
+            if num_children > 0:
+                # Select parents and create new population, reusing the
+                # scores from the ranking pass above
+                parents = self._select_parents(scores)
+                pairs = [
+                    self.pairing_strategy(parents)
+                    for _ in range((num_children + 1) // 2)
+                ]
                 
-                child1 = self._mutate(child1)
-                child2 = self._mutate(child2)
-                
-                new_population.extend([child1, child2])
+                # Cross over and mutate all children at once
+                children = self._crossover_batch(
+                    np.stack([parent1.pitches for parent1, _ in pairs]),
+                    np.stack([parent2.pitches for _, parent2 in pairs])
+                )
+                next_array[num_elite:] = self._mutate_batch(children[:num_children])
             
-            self._population = new_population[:self.population_size]
+            self._pop_array, next_array = next_array, self._pop_array
+            self._population, next_population = next_population, self._population
         
         return self.fitness_evaluator.get_best_genome(self._population)
     
-    def _initialize_population(self) -> list[MelodyGenome]:
+    def _set_population(self, genomes: list[MelodyGenome]) -> None:
         """
-        Initialize population with semi-random melodies.
+        Make genomes the current population.
         
-        Uses smart initialization that biases toward chord tones
-        to give the algorithm a head start.
+        Their pitches are packed into one (population_size, TOTAL_NOTES)
+        matrix, and each genome is rebound to a view of its row, so the
+        population can be scored as a whole without restacking.
         """
-        population = []
-        
-        for _ in range(self.population_size):
-            genome = self._generate_smart_random_genome()
-            population.append(genome)
-        
-        return population
+        self._pop_array = np.stack([genome.pitches for genome in genomes])
+        for genome, row in zip(genomes, self._pop_array):
+            genome.pitches = row
+        self._population = genomes
     
-    def _generate_smart_random_genome(self) -> MelodyGenome:
+    def _initialize_population(self) -> list[MelodyGenome]:
         """
-        Generate a random genome with bias toward chord tones.
+        Initialize population with semi-random melodies.
         
-        This initialization strategy:
+        Uses smart initialization that biases toward chord tones
+        to give the algorithm a head start. The whole population is drawn
+        at once as a (population_size, TOTAL_NOTES) matrix:
         - 70% chance of chord tone on strong beats
-        - 50% chance of any note on weak beats
-        - Includes some rests for rhythmic variety
+        - Random pitches everywhere else
+        - 30% rests for rhythmic variety
         """
-        pitches = []
+        shape = (self.population_size, TOTAL_NOTES)
+        bars = np.broadcast_to(np.arange(TOTAL_NOTES) // NOTES_PER_BAR, shape)
         
-        for bar_idx in range(NUM_BARS):
-            chord = self.progression.chords[bar_idx]
-            
-            for pos in range(NOTES_PER_BAR):
-                is_strong_beat = pos in [0, 4]
-                
-                # Random rest
-                if random.random() < 0.3:
-                    pitches.append(REST)
-                    continue
-                
-                if is_strong_beat and random.random() < 0.7:
-                    # Bias toward chord tone on strong beat
-                    pitch = self._random_chord_tone(chord)
-                else:
-                    # Random pitch
-                    pitch = random.randint(MIN_PITCH, MAX_PITCH)
-                
-                pitches.append(pitch)
+        pitches = self._rng.integers(MIN_PITCH, MAX_PITCH + 1, shape, dtype=np.int8)
+        
+        # Bias toward chord tones on strong beats
+        use_chord_tone = STRONG_BEATS & (self._rng.random(shape) < 0.7)
+        pitches[use_chord_tone] = self._random_chord_tones(bars[use_chord_tone])
         
-        return MelodyGenome(pitches=pitches)
+        # Random rests
+        pitches[self._rng.random(shape) < 0.3] = REST
+        
+        return [MelodyGenome(pitches=row) for row in pitches]
     
-    def _random_chord_tone(self, chord: JazzChord) -> int:
-        """Generate a random pitch that is a chord tone."""
-        chord_tone_interval = random.choice(chord.chord_tones)
-        octave = random.choice([60, 72])  # C4 or C5 octave
-        return octave + chord.root + chord_tone_interval
+    def _random_chord_tones(self, bars: np.ndarray) -> np.ndarray:
+        """Draw a random chord tone for each of the given bar indices."""
+        counts = self._chord_tone_counts[bars]
+        choice = (self._rng.random(bars.shape) * counts).astype(np.intp)
+        return self._chord_tone_pitches[bars, choice]
     
-    def _select_parents(self) -> list[MelodyGenome]:
-        """Select parents for breeding using fitness-proportionate selection."""
-        fitness_values = [
-            max(0.01, self.fitness_evaluator.evaluate(genome))
-            for genome in self._population
-        ]
-        
-        return random.choices(
-            self._population,
-            weights=fitness_values,
-            k=self.population_size
+    def _select_parents(self, scores: np.ndarray) -> ParentPool:
+        """
+        Select parents for breeding using fitness-proportionate selection.
+        
+        Args:
+            scores: Fitness of each genome in the current population, in
+                population order
+                
+        Returns:
+            The selected parents sorted by fitness (best to worst), as
+            expected by pairing strategies such as best_first_last, together
+            with their pitch matrix
+        """
+        weights = np.maximum(0.01, scores)
+        indices = self._rng.choice(
+            len(weights), size=self.population_size, p=weights / weights.sum()
+        )
+        indices = indices[np.argsort(-scores[indices], kind='stable')]
+        return ParentPool(
+            [self._population[i] for i in indices],
+            self._pop_array[indices],
+            self._rng
         )
     
-    def _crossover(self, parent1: MelodyGenome, parent2: MelodyGenome) -> MelodyGenome:
+    def _crossover_batch(self, parents1: np.ndarray, parents2: np.ndarray) -> np.ndarray:
         """
-        Perform one-point crossover at a bar boundary.
+        Perform one-point crossover at a bar boundary for pairs of parents.
         
         Crossing over at bar boundaries ensures that phrases remain intact,
-        which tends to preserve musical coherence.
+        which tends to preserve musical coherence. Every pair produces two
+        children, one starting with each parent, each with its own cut.
+        
+        Args:
+            parents1: (num_pairs, TOTAL_NOTES) matrix of first parents
+            parents2: (num_pairs, TOTAL_NOTES) matrix of second parents
+            
+        Returns:
+            (2 * num_pairs, TOTAL_NOTES) matrix of children, the two
+            children of each pair in adjacent rows
         """
-        cut_bar = random.randint(1, NUM_BARS - 1)
-        cut_index = cut_bar * NOTES_PER_BAR
+        heads = np.stack((parents1, parents2), axis=1).reshape(-1, TOTAL_NOTES)
+        tails = np.stack((parents2, parents1), axis=1).reshape(-1, TOTAL_NOTES)
+        
+        cut_bars = self._rng.integers(1, NUM_BARS, len(heads))
+        cut_indices = cut_bars * NOTES_PER_BAR
         
-        new_pitches = parent1.pitches[:cut_index] + parent2.pitches[cut_index:]
-        return MelodyGenome(pitches=new_pitches)
+        columns = np.arange(TOTAL_NOTES)
+        return np.where(columns < cut_indices[:, None], heads, tails)
     
-    def _mutate(self, genome: MelodyGenome) -> MelodyGenome:
+    def _mutate_batch(self, children: np.ndarray) -> np.ndarray:
         """
-        Apply mutation operators to a genome.
+        Apply mutation operators to a batch of children in place.
         
-        Mutation types (selected randomly):
+        Each child (row) mutates with probability mutation_rate, changing
+        a single random position. Mutation types (selected randomly):
         - Random pitch change (50%): Replace with random pitch or rest
         - Chord tone snap (30%): Snap to nearest chord tone
         - Rest toggle (20%): Toggle between note and rest
+        
+        Args:
+            children: (num_children, TOTAL_NOTES) matrix of child pitches
+            
+        Returns:
+            The mutated children matrix
         """
-        if random.random() >= self.mutation_rate:
-            return genome
-        
-        mutated = genome.copy()
-        mutation_type = random.random()
-        
-        if mutation_type < 0.5:
-            # Random pitch change
-            idx = random.randint(0, TOTAL_NOTES - 1)
-            if random.random() < 0.2:
-                mutated.pitches[idx] = REST
-            else:
-                mutated.pitches[idx] = random.randint(MIN_PITCH, MAX_PITCH)
-        
-        elif mutation_type < 0.8:
-            # Chord tone snap
-            idx = random.randint(0, TOTAL_NOTES - 1)
-            bar_idx = idx // NOTES_PER_BAR
-            chord = self.progression.chords[bar_idx]
-            mutated.pitches[idx] = self._random_chord_tone(chord)
-        
-        else:
-            # Rest toggle
-            idx = random.randint(0, TOTAL_NOTES - 1)
-            if mutated.pitches[idx] == REST:
-                bar_idx = idx // NOTES_PER_BAR
-                chord = self.progression.chords[bar_idx]
-                mutated.pitches[idx] = self._random_chord_tone(chord)
-            else:
-                mutated.pitches[idx] = REST
-        
-        return mutated
+        num_children = len(children)
+        will_mutate = self._rng.random(num_children) < self.mutation_rate
+        rows = np.flatnonzero(will_mutate)
+        if len(rows) == 0:
+            return children
+        
+        mutation_type = self._rng.random(len(rows))
+        idx = self._rng.integers(0, TOTAL_NOTES, len(rows))
+        bars = idx // NOTES_PER_BAR
+        
+        # Random pitch change
+        random_change = mutation_type < 0.5
+        new_pitches = np.where(
+            self._rng.random(len(rows)) < 0.2,
+            REST,
+            self._rng.integers(MIN_PITCH, MAX_PITCH + 1, len(rows))
+        )
+        
+        # Chord tone snap, and rest toggle on a rest
+        chord_tones = self._random_chord_tones(bars)
+        is_rest = children[rows, idx] == REST
+        toggle = mutation_type >= 0.8
+        new_pitches = np.where(random_change, new_pitches, chord_tones)
+        # Rest toggle on a note
+        new_pitches[toggle & ~is_rest] = REST
+        
+        children[rows, idx] = new_pitches
+        return children
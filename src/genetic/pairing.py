@@ -5,58 +5,96 @@ Pairing strategies for selecting parent pairs during crossover.
 from __future__ import annotations
 
 import random
+from functools import cached_property
 from typing import Callable
 
-from src.core import MelodyGenome
+import numpy as np
+
+from src.core import TOTAL_NOTES, MelodyGenome
+from ._pairing_numba import similarity_matrix
 
 PairingStrategy = Callable[[list[MelodyGenome]], tuple[MelodyGenome, MelodyGenome]]
 
 
+class ParentPool(list):
+    """List of parent genomes that also carries their pitches as one matrix.
+
+    The generator builds one per generation, so strategies that compare
+    parents can work on the whole matrix instead of restacking genome
+    pitches on every call. Row i of pitch_matrix holds parents[i].
+
+    Random indices are served from a block of uniform draws made with the
+    generator's NumPy Generator, refilled as it runs out, instead of one
+    random module call per pick.
+    """
+
+    def __init__(
+        self,
+        parents: list[MelodyGenome],
+        pitch_matrix: np.ndarray,
+        rng: np.random.Generator
+    ):
+        super().__init__(parents)
+        self.pitch_matrix = pitch_matrix
+        self._rng = rng
+        self._draws: list[float] = []
+        self._next_draw = 0
+
+    @cached_property
+    def similarity(self) -> np.ndarray:
+        """Matching pitch positions between every pair of parents (computed once)."""
+        return similarity_matrix(self.pitch_matrix)
+
+    def randrange(self, stop: int) -> int:
+        """Return a random index in range(stop), like random.randrange."""
+        if self._next_draw == len(self._draws):
+            self._draws = self._rng.random(2 * len(self) + 2).tolist()
+            self._next_draw = 0
+        draw = self._draws[self._next_draw]
+        self._next_draw += 1
+        return int(draw * stop)
+
+
+def _randrange(parents: list[MelodyGenome], stop: int) -> int:
+    """Random index in range(stop), from the pool's batched draws if any."""
+    if isinstance(parents, ParentPool):
+        return parents.randrange(stop)
+    return random.randrange(stop)
+
+
 def random_pairing(parents: list[MelodyGenome]) -> tuple[MelodyGenome, MelodyGenome]:
     """Select two parents uniformly at random."""
     if len(parents) < 2:
         raise ValueError("Pairing requires at least two parents")
-    return tuple(random.sample(parents, 2))
-
-
-def _similarity_score(parent1: MelodyGenome, parent2: MelodyGenome) -> int:
-    """Count matching pitch positions between two genomes."""
-    return sum(
-        1
-        for pitch1, pitch2 in zip(parent1.pitches, parent2.pitches)
-        if pitch1 == pitch2
-    )
+    # Draw the second index from the remaining positions
+    index1 = _randrange(parents, len(parents))
+    index2 = _randrange(parents, len(parents) - 1)
+    if index2 >= index1:
+        index2 += 1
+    return parents[index1], parents[index2]
 
 
 def _similarity_pairing(parents: list[MelodyGenome], pick_most_similar: bool) -> tuple[MelodyGenome, MelodyGenome]:
     if len(parents) < 2:
         raise ValueError("Pairing requires at least two parents")
 
-    parent1_index = random.randrange(len(parents))
+    parent1_index = _randrange(parents, len(parents))
     parent1 = parents[parent1_index]
 
-    best_index = None
-    best_score = None
-
-    for index, candidate in enumerate(parents):
-        if index == parent1_index:
-            continue
-
-        score = _similarity_score(parent1, candidate)
-        if best_score is None:
-            best_score = score
-            best_index = index
-
-        elif pick_most_similar and score > best_score:
-            best_score = score
-            best_index = index
-
-        elif (not pick_most_similar) and score < best_score:
-            best_score = score
-            best_index = index
-
-    if best_index is None:
-        return random_pairing(parents)
+    # Matching pitch positions between parent1 and every candidate, with
+    # parent1 itself ruled out; ties go to the first candidate
+    if isinstance(parents, ParentPool):
+        scores = parents.similarity[parent1_index].copy()
+    else:
+        pitch_matrix = np.stack([parent.pitches for parent in parents])
+        scores = np.count_nonzero(pitch_matrix == pitch_matrix[parent1_index], axis=1)
+
+    if pick_most_similar:
+        scores[parent1_index] = -1
+        best_index = int(scores.argmax())
+    else:
+        scores[parent1_index] = TOTAL_NOTES + 1
+        best_index = int(scores.argmin())
 
     return parent1, parents[best_index]
 
@@ -79,16 +117,14 @@ def best_first_last_pairing(parents: list[MelodyGenome]) -> tuple[MelodyGenome,
     if len(parents) < 2:
         raise ValueError("Pairing requires at least two parents")
 
+    # The top and bottom quarters never overlap (at least one parent each,
+    # and len(parents) >= 2), so no draw has to be rejected
     top_count = max(1, len(parents) // 4)
     bottom_count = max(1, len(parents) // 4)
 
-    parent1 = random.choice(parents[:top_count])
-    parent2 = random.choice(parents[-bottom_count:])
-
-    if parent1 is parent2:
-        return random_pairing(parents)
-
-    return parent1, parent2
+    parent1_index = _randrange(parents, top_count)
+    parent2_index = len(parents) - 1 - _randrange(parents, bottom_count)
+    return parents[parent1_index], parents[parent2_index]
 
 
 PAIRING_STRATEGIES: dict[str, PairingStrategy] = {
@@ -7,23 +7,39 @@ This module demonstrates the Genetic Jazz Melody Generator by:
 3. Running the genetic algorithm to evolve a melody
 4. Creating a music21 score with melody and chords
 5. Exporting the result to a MIDI file
-6. Optionally displaying the score
+6. Optionally displaying the score (--show)
 """
 
+import argparse
 import sys
 from pathlib import Path
 
 # Add parent directory to path for imports when running from src/
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.core import REST, NUM_BARS
+from src.core import REST
 from src.genetic import JazzFitnessEvaluator, GeneticJazzMelodyGenerator
 from src.progressions import get_progression_from_xml, get_ii_v_i_progression
 from src.utils import create_jazz_score, export_to_midi
 
 
-def main():
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse the command-line options."""
+    parser = argparse.ArgumentParser(description="Genetic Jazz Melody Generator")
+    parser.add_argument(
+        '--show', action='store_true',
+        help="display the score in the music21 viewer (e.g. MuseScore)"
+    )
+    parser.add_argument(
+        '--verbose', action='store_true',
+        help="print the generated melody bar by bar"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None):
     """Main function of the Genetic Jazz Melody Generator."""
+    args = parse_args(argv)
     
     print("Genetic Jazz Melody Generator")
     print("=" * 40)
@@ -94,23 +110,25 @@ def main():
     print(f"\nMIDI file exported: {exported_path}")
     
     # Print the generated melody
-    print("\nGenerated Melody (MIDI pitches per bar):")
-    for bar_idx in range(NUM_BARS):
-        bar = best_melody.get_bar(bar_idx)
-        chord = progression.chords[bar_idx]
-        bar_display = [
-            f"{p}" if p != REST else "R" 
-            for p in bar
-        ]
-        print(f"  Bar {bar_idx + 1} ({chord.name:6}): {bar_display}")
+    if args.verbose:
+        print("\nGenerated Melody (MIDI pitches per bar):")
+        for bar_idx, bar in enumerate(best_melody.bars):
+            chord = progression.chords[bar_idx]
+            bar_display = [
+                f"{p}" if p != REST else "R" 
+                for p in bar
+            ]
+            print(f"  Bar {bar_idx + 1} ({chord.name:6}): {bar_display}")
     
-    # Display score (optional - requires music21 viewer setup)
-    print("\nAttempting to display the generated score...")
-    try:
-        score.show()
-    except Exception as e:
-        print(f"Could not display score (viewer may not be configured): {e}")
-        print("The MIDI file can be opened in MuseScore or any MIDI player.")
+    # Display score (optional - requires music21 viewer setup); the viewer
+    # blocks until it is closed, so it is only launched when asked for
+    if args.show:
+        print("\nAttempting to display the generated score...")
+        try:
+            score.show()
+        except Exception as e:
+            print(f"Could not display score (viewer may not be configured): {e}")
+            print("The MIDI file can be opened in MuseScore or any MIDI player.")
     
     print("\nGeneration complete.")
 
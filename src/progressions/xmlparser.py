@@ -6,6 +6,7 @@ from iRealPro) and extract chord progressions for use with the genetic
 melody generator.
 """
 
+import re
 import xml.etree.ElementTree as ET
 
 from src.core import ChordProgression, ChordFactory
@@ -56,6 +57,39 @@ QUALITY_MAP = {
 }
 
 
+# Fallback for qualities missing from QUALITY_MAP: one alternative per rule,
+# tried in order of specificity. Every alternative is anchored at the start
+# and tests with lookaheads whether its substrings occur anywhere, so the
+# first rule that applies wins (not the leftmost match). Matching is
+# case-insensitive except for symbols and the '-maj7' spelling.
+_QUALITY_RE = re.compile(
+    r'^(?:'
+    r'(?P<aug_maj7>(?=.*(?i:maj7#5))|(?=.*\+)(?=.*(?i:maj7)))'
+    r'|(?P<min_maj7>(?=.*(?i:mmaj7|minmaj7))|(?=.*-maj7))'
+    r'|(?P<maj7>(?=.*(?i:maj7)))'
+    r'|(?P<half_dim>(?=.*(?i:m7b5|mi7b5))|(?=.*ø))'
+    r'|(?P<dim>(?=.*(?i:dim))|(?=.*°))'
+    r'|(?P<sus>(?=.*(?i:sus)))'
+    r'|(?P<sharp11>(?=.*#11))'
+    r'|(?P<min7>(?=.*(?i:m7|mi7|min7)))'
+    r'|(?P<dom7>(?=.*7))'
+    r'|(?P<minor>(?=.*(?i:m)))'
+    r'|(?P<aug>(?=.*\+)|(?=.*(?i:aug)))'
+    r')',
+    re.DOTALL
+)
+_QUALITY_GROUPS = {
+    'aug_maj7': 'maj7#5', 'min_maj7': 'minMaj7', 'maj7': 'maj7',
+    'half_dim': 'min7b5', 'dim': 'dim7', 'sus': '7sus4', 'sharp11': 'dom7#11',
+    'min7': 'min7', 'dom7': 'dom7', 'minor': 'min7', 'aug': 'maj7#5',
+}
+
+# Every raw quality string resolved so far, keyed as it appears in the file,
+# so repeats are a single dict lookup (a few dozen distinct spellings cover
+# the whole iRealPro corpus)
+_QUALITY_CACHE = dict(QUALITY_MAP)
+
+
 def _parse_alter(alter_val) -> str:
     """
     Convert MusicXML alter value to accidental string.
@@ -82,36 +116,24 @@ def _map_quality(quality: str) -> str:
     Returns:
         ChordFactory chord type identifier
     """
-    q = quality.strip() if quality else ""
-    
+    if quality is None:
+        quality = ""
+    cached = _QUALITY_CACHE.get(quality)
+    if cached is None:
+        cached = _QUALITY_CACHE[quality] = _resolve_quality(quality.strip())
+    return cached
+
+
+def _resolve_quality(q: str) -> str:
+    """Resolve a stripped quality string; the uncached path of _map_quality."""
     # Direct lookup
     if q in QUALITY_MAP:
         return QUALITY_MAP[q]
     
     # Fallback pattern matching (order matters for specificity)
-    q_lower = q.lower()
-    if 'maj7#5' in q_lower or ('+' in q and 'maj7' in q_lower):
-        return 'maj7#5'
-    if 'mmaj7' in q_lower or 'minmaj7' in q_lower or '-maj7' in q:
-        return 'minMaj7'
-    if 'maj7' in q_lower or 'm7' in q.upper():
-        return 'maj7'
-    if 'm7b5' in q_lower or 'ø' in q or 'mi7b5' in q_lower:
-        return 'min7b5'
-    if 'dim' in q_lower or '°' in q:
-        return 'dim7'
-    if 'sus' in q_lower:
-        return '7sus4'
-    if '#11' in q:
-        return 'dom7#11'
-    if 'm7' in q_lower or 'mi7' in q_lower or 'min7' in q_lower:
-        return 'min7'
-    if '7' in q:
-        return 'dom7'
-    if 'm' in q_lower or 'min' in q_lower:
-        return 'min7'
-    if '+' in q or 'aug' in q_lower:
-        return 'maj7#5'
+    match = _QUALITY_RE.match(q)
+    if match:
+        return _QUALITY_GROUPS[match.lastgroup]
     
     return 'maj7'  # Default fallback
 
@@ -133,36 +155,47 @@ def get_progression_from_xml(xml_path: str) -> ChordProgression:
         FileNotFoundError: If the XML file does not exist
         ET.ParseError: If the XML file is malformed
     """
-    tree = ET.parse(xml_path)
-    root = tree.getroot()
-    
-    # Extract song title
-    title_node = root.find('.//work-title') or root.find('.//movement-title')
-    song_title = title_node.text if title_node is not None else "Unknown"
-    
-    # Parse first 8 bars, one chord per bar
-    part = root.find('part')
+    song_title = "Unknown"
+    title_found = False
     chord_data = []  # List of (root, quality) tuples
     last_chord = None
-    
-    for measure in list(part.findall('measure'))[:8]:
-        harmony = measure.find('harmony')
-        if harmony is not None:
-            # Extract root note
-            root_node = harmony.find('root')
-            root_step = root_node.find('root-step').text.upper()  # Ensure uppercase
-            alter_node = root_node.find('root-alter')
-            alter = _parse_alter(alter_node.text if alter_node is not None else 0)
-            chord_root = f"{root_step}{alter}"
+    measure_count = 0
+    
+    # Stream the file instead of building the whole tree: the header comes
+    # first, and parsing stops after the first 8 bars of the first part
+    for _, elem in ET.iterparse(xml_path, events=('end',)):
+        if elem.tag == 'movement-title' and not title_found:
+            song_title = elem.text
+            title_found = True
+        
+        elif elem.tag == 'measure':
+            harmony = elem.find('harmony')
+            if harmony is not None:
+                # Extract root note
+                root_node = harmony.find('root')
+                root_step = root_node.find('root-step').text.upper()  # Ensure uppercase
+                alter_node = root_node.find('root-alter')
+                alter = _parse_alter(alter_node.text if alter_node is not None else 0)
+                chord_root = f"{root_step}{alter}"
+                
+                # Extract quality
+                kind = harmony.find('kind')
+                quality = kind.get('text') or kind.text or ""
+                
+                last_chord = (chord_root, quality)
             
-            # Extract quality
-            kind = harmony.find('kind')
-            quality = kind.get('text') or kind.text or ""
+            if last_chord:
+                chord_data.append(last_chord)
             
-            last_chord = (chord_root, quality)
+            # Measures are not needed once read; keep memory flat
+            elem.clear()
+            measure_count += 1
+            if measure_count == 8:
+                break
         
-        if last_chord:
-            chord_data.append(last_chord)
+        elif elem.tag == 'part':
+            # First part had fewer than 8 bars
+            break
     
     # Pad to 8 bars if needed
     while len(chord_data) < 8 and last_chord:
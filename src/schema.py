@@ -0,0 +1,134 @@
+"""
+Request schema for the web API.
+
+Parses the JSON body of /api/generate into typed, immutable objects in a
+single pass. Values that are missing or cannot be converted fall back to
+their defaults, so the request handler never sees raw client input. A body
+whose structure is wrong (e.g. an array where an object is expected)
+raises ValueError instead.
+"""
+
+from dataclasses import dataclass, field, fields
+
+from src.genetic import get_default_weights
+
+
+def _coerce(value, target_type, default):
+    """Convert a JSON value to target_type, falling back to default."""
+    if value is None:
+        return default
+    try:
+        if target_type in (int, float):
+            # Accept numeric strings and truncate floats for int fields
+            return target_type(float(value))
+        return target_type(value)
+    except (TypeError, ValueError, OverflowError):
+        return default
+
+
+def _chord_list(value) -> list:
+    """Return the custom chords as a list of {root, quality} string objects."""
+    if value is None:
+        return []
+    if not isinstance(value, list) or not all(
+        isinstance(chord, dict)
+        and isinstance(chord.get('root'), str)
+        and isinstance(chord.get('quality'), str)
+        for chord in value
+    ):
+        raise ValueError("'chords' must be a list of {root, quality} objects with string values")
+    return value
+
+
+def _require_object(value, what: str) -> dict:
+    """Return value as a JSON object, treating null/missing as empty."""
+    if value is None:
+        return {}
+    if not isinstance(value, dict):
+        raise ValueError(f"{what} must be a JSON object")
+    return value
+
+
+@dataclass(frozen=True)
+class GenerationParams:
+    """Genetic algorithm parameters accepted from the client."""
+    population_size: int = 100
+    mutation_rate: float = 0.15
+    elite_size: int = 5
+    pairing_strategy: str = 'random'
+
+    @classmethod
+    def from_json(cls, data) -> 'GenerationParams':
+        """
+        Build parameters from a JSON object, ignoring unknown keys.
+
+        Raises:
+            ValueError: If 'params' is not a JSON object, population_size
+                is less than 1 or elite_size is negative
+        """
+        data = _require_object(data, "'params'")
+        params = cls(**{
+            f.name: _coerce(data.get(f.name), f.type, f.default)
+            for f in fields(cls)
+        })
+        if params.population_size < 1:
+            raise ValueError("'population_size' must be at least 1")
+        if params.elite_size < 0:
+            raise ValueError("'elite_size' must not be negative")
+        return params
+
+
+@dataclass(frozen=True)
+class GenerateRequest:
+    """
+    Parsed body of a /api/generate request.
+
+    Attributes:
+        mode: 'song' to harmonize a song from the data folder, 'custom'
+            to use the chords given in the request
+        generations: Number of generations to evolve
+        song: Song name (song mode)
+        chords: List of {'root', 'quality'} objects (custom mode)
+        progression_name: Display name of a custom progression
+        weights: Fitness weights, with defaults filled in for missing keys
+        params: Genetic algorithm parameters
+        keep_on_disk: Also save the MIDI file to the output folder while
+            the job is kept; its URL is reported as midi_file_url
+    """
+    mode: str = 'song'
+    generations: int = 1000
+    song: str | None = None
+    chords: list = field(default_factory=list)
+    progression_name: str = 'Custom Progression'
+    weights: dict[str, float] = field(default_factory=get_default_weights)
+    params: GenerationParams = field(default_factory=GenerationParams)
+    keep_on_disk: bool = False
+
+    @classmethod
+    def from_json(cls, data) -> 'GenerateRequest':
+        """
+        Build a request from the decoded JSON body.
+
+        Raises:
+            ValueError: If the body, 'weights' or 'params' is not a JSON
+                object, 'chords' is not a list of objects with string
+                root and quality, or the parameters are out of range
+        """
+        data = _require_object(data, "Request body")
+
+        incoming_weights = _require_object(data.get('weights'), "'weights'")
+        weights = {
+            key: _coerce(incoming_weights.get(key), float, default)
+            for key, default in get_default_weights().items()
+        }
+
+        return cls(
+            mode=data.get('mode', 'song'),
+            generations=_coerce(data.get('generations'), int, 1000),
+            song=data.get('song'),
+            chords=_chord_list(data.get('chords')),
+            progression_name=data.get('progression_name', 'Custom Progression'),
+            weights=weights,
+            params=GenerationParams.from_json(data.get('params')),
+            keep_on_disk=data.get('keep_on_disk') is True,
+        )
@@ -5,8 +5,11 @@ This module provides helper functions for creating music21 scores from
 melody genomes and chord progressions, and for exporting to various
 formats (MIDI, PNG).
 """
-import re
+import copy
+from functools import lru_cache
+
 import music21
+import numpy as np
 
 from src.core import (
     REST, NUM_BARS, NOTES_PER_BAR, EIGHTH_NOTE_DURATION,
@@ -14,6 +17,29 @@ from src.core import (
 )
 
 
+@lru_cache(maxsize=256)
+def _parsed_chord_symbol(name: str) -> music21.harmony.ChordSymbol:
+    """
+    Parse a music21 chord symbol once per name.
+    
+    Callers must copy the result before placing it in a stream; parsing is
+    far slower than a deepcopy, and progressions repeat chords constantly.
+    """
+    return music21.harmony.ChordSymbol(name)
+
+
+@lru_cache(maxsize=256)
+def _spelled_block_chord(pitches: tuple[int, ...]) -> music21.chord.Chord:
+    """
+    Build a whole-bar block chord once per voicing.
+    
+    Built from MIDI numbers, music21 spells the chord by brute-force
+    enharmonic search, which dominates score creation. Callers must copy
+    the result, as for _parsed_chord_symbol.
+    """
+    return music21.chord.Chord(list(pitches), quarterLength=4)
+
+
 def create_jazz_score(
     melody_genome: MelodyGenome,
     progression: ChordProgression
@@ -37,63 +63,49 @@ def create_jazz_score(
     score.metadata.title = f"Jazz Melody over {progression.name}"
     score.metadata.composer = "Genetic Algorithm"
     
-    # Create melody part
+    # Create melody part. Each part's elements are collected and appended
+    # in one call, which places them back to back and updates the part's
+    # bookkeeping once instead of per element
     melody_part = music21.stream.Part()
     melody_part.partName = "Melody"
-    melody_part.append(music21.meter.TimeSignature('4/4'))
+    melody_elements = [music21.meter.TimeSignature('4/4')]
     
     # Convert genome to notes, consolidating consecutive identical pitches
-    current_duration = 0.0
-    i = 0
-    while i < len(melody_genome.pitches):
-        pitch = melody_genome.pitches[i]
-        
-        # Consolidate consecutive identical pitches or rests
-        duration = EIGHTH_NOTE_DURATION
-        j = i + 1
-        while j < len(melody_genome.pitches) and \
-              melody_genome.pitches[j] == pitch and \
-              j % NOTES_PER_BAR != 0:  # Don't cross bar lines
-            duration += EIGHTH_NOTE_DURATION
-            j += 1
+    # or rests into runs that never cross a bar line
+    pitches = melody_genome.pitches
+    run_starts = np.flatnonzero(
+        np.concatenate(([True], pitches[1:] != pitches[:-1]))
+        | (np.arange(len(pitches)) % NOTES_PER_BAR == 0)
+    )
+    run_lengths = np.diff(run_starts, append=len(pitches))
+    
+    for pitch, length in zip(pitches[run_starts].tolist(), run_lengths.tolist()):
+        duration = length * EIGHTH_NOTE_DURATION
         
         if pitch == REST:
-            rest = music21.note.Rest(quarterLength=duration)
-            rest.offset = current_duration
-            melody_part.append(rest)
+            melody_elements.append(music21.note.Rest(quarterLength=duration))
         else:
-            note = music21.note.Note(pitch, quarterLength=duration)
-            note.offset = current_duration
-            melody_part.append(note)
-        
-        current_duration += duration
-        i = j
+            melody_elements.append(music21.note.Note(pitch, quarterLength=duration))
+    
+    melody_part.append(melody_elements)
     
     # Create chord part
     chord_part = music21.stream.Part()
     chord_part.partName = "Chords"
-    chord_part.append(music21.meter.TimeSignature('4/4'))
-    
-    current_offset = 0.0
-    for chord_obj in progression.chords:
-        # Build chord notes in bass register
-        chord_notes = []
-        for interval in chord_obj.chord_tones:
-            midi_pitch = 48 + chord_obj.root + interval
-            chord_notes.append(midi_pitch)
-        
-        m21_chord = music21.chord.Chord(chord_notes, quarterLength=4)
-        m21_chord.offset = current_offset
-        
-        # Add chord symbol - convert 'b' to '-' for music21 compatibility
-        # music21 uses '-' for flats (e.g., 'B-maj7' not 'Bbmaj7')
-        chord_name_m21 = re.sub(r'([A-G])b', r'\1-', chord_obj.name)
-        chord_symbol = music21.harmony.ChordSymbol(chord_name_m21)
-        chord_symbol.offset = current_offset
-        chord_part.append(chord_symbol)
-        chord_part.append(m21_chord)
+    chord_elements = [music21.meter.TimeSignature('4/4')]
+    
+    for chord_obj, voicing in zip(progression.chords, progression.chord_tone_matrix):
+        # Chord notes in bass register
+        chord_notes = tuple(voicing[voicing != REST].tolist())
         
-        current_offset += 4
+        # Chord symbol, with the name spelled the music21 way; it takes no
+        # time, so it lands on the same offset as the block chord after it
+        chord_elements.append(
+            copy.deepcopy(_parsed_chord_symbol(chord_obj.music21_name))
+        )
+        chord_elements.append(copy.deepcopy(_spelled_block_chord(chord_notes)))
+    
+    chord_part.append(chord_elements)
     
     score.append(melody_part)
     score.append(chord_part)
@@ -101,6 +113,19 @@ def create_jazz_score(
     return score
 
 
+def midi_bytes(score: music21.stream.Score) -> bytes:
+    """
+    Render a music21 score as the contents of a standard MIDI file.
+    
+    Args:
+        score: The score to render
+        
+    Returns:
+        The MIDI file as bytes, without touching the filesystem
+    """
+    return music21.midi.translate.music21ObjectToMidiFile(score).writestr()
+
+
 def export_to_midi(score: music21.stream.Score, filename: str) -> str:
     """
     Export a music21 score to MIDI file.
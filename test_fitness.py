@@ -0,0 +1,125 @@
+"""
+Consistency tests for the fitness implementations.
+
+Every fitness component exists three times: in the compiled kernel
+(_fitness_numba), in the whole-population NumPy functions
+(_fitness_batch) and in the per-genome methods of JazzFitnessEvaluator.
+The per-genome methods are the reference; the other two must match them.
+All three read melodic motion scores from MOTION_SCORE_LUT, which is
+checked against the interval buckets it encodes.
+"""
+
+import numpy as np
+import pytest
+
+from src.core import REST, MIN_PITCH, MAX_PITCH, TOTAL_NOTES, MelodyGenome
+from src.genetic import fitness
+from src.genetic._fitness_numba import MOTION_SCORE_LUT
+from src.genetic.fitness import JazzFitnessEvaluator, get_default_weights
+from src.progressions import (
+    get_ii_v_i_progression,
+    get_ii_v_i_vi7_ii_v_iii_progression,
+    get_autumn_leaves_progression,
+    get_minor_blues_progression,
+    get_progression_from_xml,
+)
+
+PROGRESSIONS = {
+    'ii-V-I': get_ii_v_i_progression,
+    'ii-V-I-vi7-ii-V-iii': get_ii_v_i_vi7_ii_v_iii_progression,
+    'Autumn Leaves': get_autumn_leaves_progression,
+    'minor blues': get_minor_blues_progression,
+    'A Felicidade (XML)': lambda: get_progression_from_xml('data/A Felicidade 1.xml'),
+}
+
+COMPONENTS = list(get_default_weights())
+
+
+def _population() -> np.ndarray:
+    """Random genomes followed by hand-picked edge cases."""
+    rng = np.random.default_rng(2024)
+    random_genomes = rng.integers(MIN_PITCH, MAX_PITCH + 1, (200, TOTAL_NOTES), dtype=np.int8)
+    random_genomes[rng.random(random_genomes.shape) < 0.3] = REST
+
+    slots = np.arange(TOTAL_NOTES)
+    edge_genomes = np.array([
+        np.full(TOTAL_NOTES, REST),                                 # all rests
+        np.full(TOTAL_NOTES, 60),                                   # one constant pitch
+        np.where(slots % 2 == 0, 64, REST),                         # alternating rests
+        np.where(slots % 2 == 0, MIN_PITCH, MAX_PITCH),             # widest leaps
+        np.where(slots == 0, 67, REST),                             # a single note
+        MIN_PITCH + slots % (MAX_PITCH - MIN_PITCH + 1),            # rising scale
+    ], dtype=np.int8)
+
+    return np.concatenate((random_genomes, edge_genomes))
+
+
+def _reference_scores(progression, weights, population) -> np.ndarray:
+    """Scores from the per-genome Python methods."""
+    evaluator = JazzFitnessEvaluator(progression, weights=weights)
+    return np.array([
+        evaluator.evaluate(MelodyGenome(pitches=row.copy())) for row in population
+    ])
+
+
+@pytest.fixture(scope='module')
+def population():
+    return _population()
+
+
+@pytest.mark.parametrize('compiled', [
+    pytest.param(True, marks=pytest.mark.skipif(
+        not fitness.HAS_COMPILED_KERNEL, reason="no compiled kernel available"
+    )),
+    False,
+], ids=['kernel', 'numpy'])
+@pytest.mark.parametrize('component', COMPONENTS)
+@pytest.mark.parametrize('progression_name', PROGRESSIONS)
+def test_population_scores_match_reference(
+    monkeypatch, population, progression_name, component, compiled
+):
+    """evaluate_population() matches evaluate() on the Python methods, per component."""
+    progression = PROGRESSIONS[progression_name]()
+    weights = {component: 1.0}
+
+    monkeypatch.setattr(fitness, 'HAS_COMPILED_KERNEL', False)
+    expected = _reference_scores(progression, weights, population)
+
+    monkeypatch.setattr(fitness, 'HAS_COMPILED_KERNEL', compiled)
+    scores = JazzFitnessEvaluator(progression, weights=weights).evaluate_population(population)
+
+    np.testing.assert_allclose(scores, expected, rtol=0, atol=1e-12)
+
+
+@pytest.mark.skipif(not fitness.HAS_COMPILED_KERNEL, reason="no compiled kernel available")
+@pytest.mark.parametrize('progression_name', PROGRESSIONS)
+def test_kernel_evaluate_matches_reference(monkeypatch, population, progression_name):
+    """evaluate() through the compiled kernel matches the Python methods."""
+    progression = PROGRESSIONS[progression_name]()
+    weights = get_default_weights()
+
+    monkeypatch.setattr(fitness, 'HAS_COMPILED_KERNEL', False)
+    expected = _reference_scores(progression, weights, population)
+
+    monkeypatch.setattr(fitness, 'HAS_COMPILED_KERNEL', True)
+    scores = _reference_scores(progression, weights, population)
+
+    np.testing.assert_allclose(scores, expected, rtol=0, atol=1e-12)
+
+
+def test_motion_score_lut_matches_interval_buckets():
+    """MOTION_SCORE_LUT encodes the step/third/fourth/fifth/sixth/leap scores."""
+    def bucket_score(interval):
+        if interval <= 2:  # Step (minor/major 2nd)
+            return 1.0
+        if interval <= 4:  # Third
+            return 0.9
+        if interval <= 5:  # Fourth
+            return 0.7
+        if interval <= 7:  # Fifth
+            return 0.5
+        if interval <= 9:  # Sixth
+            return 0.3
+        return 0.1  # Larger leaps
+
+    assert MOTION_SCORE_LUT.tolist() == [bucket_score(i) for i in range(256)]
@@ -0,0 +1,91 @@
+"""
+Tests for parsing /api/generate request bodies.
+
+Values that cannot be converted fall back to their defaults, while bodies
+with the wrong structure are rejected with a 400 JSON error.
+"""
+
+import pytest
+
+from src.app import app
+from src.genetic import get_default_weights
+from src.schema import GenerateRequest, GenerationParams
+
+VALID_CHORD = {'root': 'C', 'quality': 'maj7'}
+
+MALFORMED_BODIES = {
+    'array body': [1, 2],
+    'string body': 'song',
+    'weights array': {'weights': []},
+    'weights string': {'weights': 'heavy'},
+    'params array': {'params': [100]},
+    'chords string': {'mode': 'custom', 'chords': 'abc'},
+    'chords of numbers': {'mode': 'custom', 'chords': [1] * 8},
+    'chord root list': {'mode': 'custom', 'chords': [{'root': ['C'], 'quality': 'maj7'}] * 8},
+    'chord quality number': {'mode': 'custom', 'chords': [{'root': 'C', 'quality': 7}] * 8},
+    'chord without quality': {'mode': 'custom', 'chords': [{'root': 'C'}] * 8},
+    'empty population': {'params': {'population_size': 0}},
+    'negative elite size': {'params': {'elite_size': -1}},
+}
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+def test_missing_body_uses_defaults():
+    gen_request = GenerateRequest.from_json(None)
+    assert gen_request.mode == 'song'
+    assert gen_request.generations == 1000
+    assert gen_request.chords == []
+    assert gen_request.weights == get_default_weights()
+    assert gen_request.params == GenerationParams()
+    assert gen_request.keep_on_disk is False
+
+
+def test_unconvertible_values_fall_back_to_defaults():
+    gen_request = GenerateRequest.from_json({
+        'generations': 'many',
+        'weights': {'note_density': 'high', 'range_fitness': '0.3'},
+        'params': {'population_size': '50', 'mutation_rate': None},
+        'keep_on_disk': 'yes',
+    })
+    defaults = get_default_weights()
+    assert gen_request.generations == 1000
+    assert gen_request.weights['note_density'] == defaults['note_density']
+    assert gen_request.weights['range_fitness'] == 0.3
+    assert gen_request.params.population_size == 50
+    assert gen_request.params.mutation_rate == GenerationParams.mutation_rate
+    assert gen_request.keep_on_disk is False
+
+
+def test_custom_chords_are_kept():
+    gen_request = GenerateRequest.from_json({'mode': 'custom', 'chords': [VALID_CHORD] * 8})
+    assert gen_request.chords == [VALID_CHORD] * 8
+
+
+@pytest.mark.parametrize('body', MALFORMED_BODIES.values(), ids=MALFORMED_BODIES)
+def test_malformed_body_raises(body):
+    with pytest.raises(ValueError):
+        GenerateRequest.from_json(body)
+
+
+@pytest.mark.parametrize('body', MALFORMED_BODIES.values(), ids=MALFORMED_BODIES)
+def test_malformed_body_is_a_json_400(client, body):
+    response = client.post('/api/generate', json=body)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def test_unknown_chord_is_a_json_400(client):
+    chords = [VALID_CHORD] * 7 + [{'root': 'H', 'quality': 'maj7'}]
+    response = client.post('/api/generate', json={'mode': 'custom', 'chords': chords})
+    assert response.status_code == 400
+    assert 'Invalid chord' in response.get_json()['error']
+
+
+def test_unknown_song_is_a_json_404(client):
+    response = client.post('/api/generate', json={'song': 'No Such Song'})
+    assert response.status_code == 404
+    assert 'error' in response.get_json()
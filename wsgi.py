@@ -0,0 +1,22 @@
+"""
+WSGI entry point for running the web application under a production server.
+
+Example:
+    gunicorn -w 1 -k gthread --threads 4 -t 300 wsgi:app
+
+Run exactly one worker process. Generation jobs live in that process's
+memory, so a status, MIDI or cancel poll served by any other worker would
+get 404 for a live job. Jobs run on the app's own background threads, and
+the gthread threads keep the polling endpoints responsive meanwhile.
+The generous timeout covers long runs with many generations.
+"""
+
+from src.app import app
+from src.genetic import _fitness_numba, _pairing_numba
+
+# Compile the fitness and pairing kernels when the worker boots, not on the
+# first request that needs them
+_fitness_numba.warmup()
+_pairing_numba.warmup()
+
+__all__ = ["app"]